@@ -1,6 +1,6 @@
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["pandas"]
+# dependencies = ["pandas", "pyarrow"]
 # ///
 """
 CSV Processor
@@ -9,75 +9,1280 @@ CSV Processor
 Filters CSV rows by status and outputs selected columns.
 This is the complete script from Pattern 4: Automate Repeatable Steps.
 
+For files larger than memory, --chunksize streams the input: only the
+needed columns are read, a chunk of rows at a time, and each filtered
+chunk is appended to the output, so memory use depends on the chunk
+size rather than the file size.
+
+--workers N filters on N processes: the file is split into
+newline-aligned byte ranges (shards), each shard is parsed and filtered
+in a process pool, and the shard outputs are concatenated in order.
+Shards are split on raw newlines; if a quoted field with a line break
+straddles a shard boundary, the file is streamed on one process instead.
+
+Output is CSV, Parquet or Feather, chosen by the output file's extension
+or --format. Columnar output keeps column types and is much faster for
+downstream jobs to re-read than CSV. --engine pyarrow parses the input
+with the multithreaded Arrow CSV reader into Arrow-backed columns.
+Parquet input is filtered with predicate pushdown: only the selected
+columns are read, and row groups whose statistics rule out the status
+value are skipped.
+
+--filter NAME=EXPRESSION selects rows with a small expression language
+instead of the status filter, and can be repeated: every filter is
+evaluated on the same pass over the input and writes its own output
+(input_NAME.csv). Expressions compile to vectorized pandas masks:
+
+    status == active and joined_date >= 2024-01-10
+    department in (Engineering, Sales) or not status == inactive
+    id between 100 and 200
+    name != "Alice Johnson" and (age < 30 or age >= 65)
+
+Operators are ==, !=, <, <=, >, >=, in (...), not in (...),
+between ... and ..., joined with and / or / not and parentheses. Words
+that parse as numbers are compared numerically (text columns are
+converted); quote anything else that contains spaces or symbols.
+
+--index COLUMN keeps a sidecar index next to the input (input.csv.COLUMN.idx,
+plus input.csv.COLUMN.idx.npy) with the byte offsets of every row, grouped
+by the row's value in COLUMN. Lookups memory-map the offsets and read only
+the groups of the values they match.
+It is built on first use and rebuilt whenever the file's size or
+modification time changes. When every filter selects specific values of
+that column (e.g. the status filter, or `COLUMN in (a, b) and ...`), only
+the matching rows are read, so repeated filters on a large file cost I/O
+proportional to the result rather than a full scan. The index also records
+the column types of a full read, so the matching rows get the same types
+(and the same output) as when the whole file is scanned. Number literals
+(e.g. `COLUMN == 1`) may be written several ways in the file and always scan.
+
 Usage:
     uv run csv-processor.py input.csv
     uv run csv-processor.py input.csv --status active
     uv run csv-processor.py input.csv --status active --columns name,email
+    uv run csv-processor.py huge.csv --status active --chunksize 500000
+    uv run csv-processor.py huge.csv --status active --workers 8
+    uv run csv-processor.py input.csv --engine pyarrow --output active.parquet
+    uv run csv-processor.py input.parquet --status active --format feather
+    uv run csv-processor.py input.csv --filter "eng=department == Engineering" --filter "new=joined_date >= 2024-06-01"
+    uv run csv-processor.py huge.csv --status pending --index status
 
 Output:
-    filtered_output.csv with specified columns
+    input_filtered.csv (or .parquet / .feather) with specified columns,
+    or one input_NAME file per --filter
 """
 
+import io
+import mmap
+import operator
+import os
+import re
+import shutil
 import sys
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import ExitStack
 from pathlib import Path
+import numpy as np
 import pandas as pd
 
+# Upper bound on a shard's size, so each worker holds at most this much input at once
+SHARD_BYTES = 64 * 1024 * 1024
+
+# Rows per chunk when --workers can't shard a file and streams it instead
+FALLBACK_CHUNKSIZE = 1_000_000
+
+# Bytes scanned at a time when finding row offsets for an index
+INDEX_BLOCK_BYTES = 64 * 1024 * 1024
+
+# Row records (value code, delta, length) spilled while building an index,
+# and how many are sorted into place at a time
+INDEX_SPILL_DTYPE = np.dtype([("code", np.int64), ("delta", np.uint64), ("length", np.uint64)])
+INDEX_SPILL_ROWS = 4_000_000
+
+# Layout of the sidecar index files; indexes from other versions are rebuilt
+INDEX_VERSION = 2
+
+# Output format for each supported file extension
+OUTPUT_FORMATS = {".csv": "csv", ".parquet": "parquet", ".feather": "feather"}
+
+# CSV parsers for --engine (c is pandas' default)
+ENGINES = ("c", "pyarrow")
+
+COMPARISONS = {
+    "==": operator.eq,
+    "!=": operator.ne,
+    "<": operator.lt,
+    "<=": operator.le,
+    ">": operator.gt,
+    ">=": operator.ge
+}
+
+# Quoted strings, operators / punctuation, or bare words (column names, values, keywords)
+TOKEN_PATTERN = re.compile(r"""\s*(?:("(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*')|(==|!=|<=|>=|<|>|=|\(|\)|,)|([^\s(),=!<>'"]+))""")
+
 
 def process_csv(
     input_file: str,
     status_filter: str = "active",
     columns: list[str] | None = None,
-    output_file: str | None = None
+    output_file: str | None = None,
+    chunksize: int | None = None,
+    workers: int | None = None,
+    output_format: str | None = None,
+    engine: str | None = None,
+    filters: dict[str, str] | None = None,
+    index_column: str | None = None
 ):
-    """Filter CSV by status and select specific columns."""
+    """
+    Filter CSV by status and select specific columns.
+
+    With `filters` (name -> expression), each named filter replaces the
+    status filter and writes its own output, all from one read of the file.
+    With `index_column`, rows are looked up in a sidecar index on that
+    column instead of scanning the whole file, when the filters allow it.
+    """
     input_path = Path(input_file)
     if not input_path.exists():
         print(f"Error: File not found: {input_file}")
         sys.exit(1)
 
-    # Read the CSV
+    output_format = resolve_output_format(output_file, output_format)
+    if filters and output_file is not None:
+        print(f"Note: --output is ignored with --filter (outputs are named {input_path.stem}_NAME.{output_format})")
+    if output_file is None:
+        output_file = f"{input_path.stem}_filtered.{output_format}"
+
+    if index_column and (input_path.suffix == ".parquet" or chunksize or (workers and workers > 1)):
+        print("Note: --index only applies to CSV input without --chunksize / --workers, ignoring it")
+        index_column = None
+    if index_column and engine == "pyarrow":
+        # The index records the column types of the default parser, which the Arrow reader doesn't share
+        print("Note: --index reads rows with the default parser, ignoring --engine pyarrow")
+        engine = None
+
+    if input_path.suffix == ".parquet":
+        process_parquet(input_path, status_filter, columns, output_file, output_format, filters)
+        return
+
+    if workers and workers > 1:
+        process_csv_parallel(input_path, status_filter, columns, output_file, workers, output_format, filters)
+        return
+
+    if chunksize:
+        process_csv_streaming(
+            input_path, status_filter, columns, output_file, chunksize, output_format, engine, filters
+        )
+        return
+
+    # Read the header to plan which columns to parse
     print(f"Reading: {input_file}")
-    df = pd.read_csv(input_file)
-    print(f"Total rows: {len(df)}")
+    available = list(pd.read_csv(input_path, nrows=0).columns)
+    requested = [c for c in columns if c in available] if columns else available
+    queries = plan_queries(available, status_filter, filters, input_path, output_file, output_format)
 
-    # Show available columns
-    print(f"Available columns: {', '.join(df.columns)}")
+    # Read the CSV (or, with an index, just the rows the filters can match)
+    source, total_rows, dtypes = input_path, None, {}
+    if index_column:
+        source, total_rows, dtypes = read_indexed_rows(input_path, index_column, available, queries)
 
-    # Filter by status if the column exists
-    if "status" in df.columns:
-        df_filtered = df[df["status"] == status_filter]
-        print(f"After filtering (status='{status_filter}'): {len(df_filtered)} rows")
+    # Matched rows alone may infer other types than the whole file would (1 where a
+    # full read has 1.0), so they're read with the whole file's types
+    usecols = needed_columns(available, requested, queries)
+    if engine == "pyarrow":
+        df = pd.read_csv(source, usecols=usecols, engine="pyarrow", dtype_backend="pyarrow")
     else:
-        print("Warning: No 'status' column found, skipping filter")
-        df_filtered = df
+        df = pd.read_csv(source, usecols=usecols, dtype={c: dtypes[c] for c in usecols if c in dtypes} or None)
+
+    print(f"Total rows: {total_rows or len(df)}")
+    print(f"Available columns: {', '.join(available)}")
+
+    # Filter, then select the output columns and save each output
+    filtered = [apply_query(df, row_filter, usecols) for _, _, row_filter in queries]
+    report_filters(queries, [len(f) for f in filtered])
+
+    output_columns = select_columns(available, columns)
+    results = []
+    for (_, query_output, _), df_filtered in zip(queries, filtered):
+        df_filtered = df_filtered[output_columns]
+        write_output(df_filtered, query_output, output_format)
+        results.append(df_filtered)
+
+    report_outputs(queries, [len(r) for r in results], [r.head() for r in results])
 
-    # Select specific columns if provided
-    if columns:
-        valid_columns = [c for c in columns if c in df_filtered.columns]
-        invalid_columns = [c for c in columns if c not in df_filtered.columns]
 
-        if invalid_columns:
-            print(f"Warning: Columns not found: {', '.join(invalid_columns)}")
+def select_columns(available: list[str], columns: list[str] | None) -> list[str]:
+    """Requested columns that exist in the file (all columns if none were requested)."""
+    if not columns:
+        return list(available)
 
-        if valid_columns:
-            df_filtered = df_filtered[valid_columns]
-            print(f"Selected columns: {', '.join(valid_columns)}")
+    valid_columns = [c for c in columns if c in available]
+    invalid_columns = [c for c in columns if c not in available]
+
+    if invalid_columns:
+        print(f"Warning: Columns not found: {', '.join(invalid_columns)}")
+
+    if not valid_columns:
+        print("Error: None of the specified columns exist")
+        sys.exit(1)
+
+    print(f"Selected columns: {', '.join(valid_columns)}")
+    return valid_columns
+
+
+def resolve_output_format(output_file: str | None, output_format: str | None) -> str:
+    """Output format from --format, else from the output file's extension (CSV by default)."""
+    if output_format is None and output_file is not None:
+        output_format = OUTPUT_FORMATS.get(Path(output_file).suffix.lower(), "csv")
+
+    output_format = output_format or "csv"
+    if output_format not in OUTPUT_FORMATS.values():
+        print(f"Error: Unknown output format: {output_format} (expected csv, parquet or feather)")
+        sys.exit(1)
+    return output_format
+
+
+def write_output(df: pd.DataFrame, output_file: str, output_format: str):
+    """Write a DataFrame as CSV, Parquet or Feather."""
+    if output_format == "parquet":
+        df.to_parquet(output_file, index=False)
+    elif output_format == "feather":
+        df.reset_index(drop=True).to_feather(output_file)
+    else:
+        df.to_csv(output_file, index=False)
+
+
+class ChunkWriter:
+    """
+    Append DataFrames (or Arrow tables) to one CSV, Parquet or Feather file.
+
+    The file only replaces `output_file` once every chunk is written, so
+    a failed run never leaves a truncated output behind. Chunks can infer
+    different types for a column (e.g. int64, then double), so columnar
+    chunks are kept as Feather parts and merged to a common schema on close.
+    """
+
+    def __init__(self, output_file: str, output_format: str, columns: list[str]):
+        self.output_file = output_file
+        self.output_format = output_format
+        self.columns = columns
+        self._tmp_file = f"{output_file}.tmp"
+        self._csv = open(self._tmp_file, "w", newline="") if output_format == "csv" else None
+        self._parts_dir = None  # Feather parts of columnar output, created on the first chunk
+        self._parts = []
+        self._started = False
+
+    def write(self, df: pd.DataFrame):
+        if self._csv is not None:
+            # Header only before the first chunk
+            df.to_csv(self._csv, index=False, header=not self._started)
+            self._started = True
         else:
-            print("Error: None of the specified columns exist")
+            import pyarrow as pa
+            self.write_table(pa.Table.from_pandas(df, preserve_index=False))
+
+    def write_table(self, table):
+        import pyarrow.feather as feather
+
+        if self._parts_dir is None:
+            self._parts_dir = tempfile.mkdtemp(prefix=".parts-", dir=Path(self.output_file).resolve().parent)
+        part = os.path.join(self._parts_dir, f"{len(self._parts):05d}.feather")
+        feather.write_feather(table, part, compression="uncompressed")
+        self._parts.append(part)
+        self._started = True
+
+    def close(self, failed: bool = False):
+        """Move the finished file into place (or, if `failed`, just clean up)."""
+        if self._csv is not None:
+            self._csv.close()
+        try:
+            if failed:
+                return
+            if self._parts:
+                merge_columnar_shards(self._parts, self.output_file, self.output_format, self.columns)
+                return
+            if not self._started:
+                # Nothing was written: still produce a file with the header / schema
+                write_output(pd.DataFrame(columns=self.columns), self._tmp_file, self.output_format)
+            os.replace(self._tmp_file, self.output_file)
+        finally:
+            if self._parts_dir is not None:
+                shutil.rmtree(self._parts_dir, ignore_errors=True)
+            if os.path.exists(self._tmp_file):
+                os.remove(self._tmp_file)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        self.close(failed=exc_type is not None)
+
+
+class FilterError(ValueError):
+    """Invalid filter expression."""
+
+
+class RowFilter:
+    """
+    A parsed filter expression that computes a boolean row mask for a DataFrame.
+
+    The expression is parsed once into a small tree of
+    ("or" | "and" | "not" | "cmp" | "in" | "between", ...) tuples, which
+    mask() evaluates with vectorized pandas operations. Comparisons with
+    a missing value are unknown (SQL-style), and unknown rows never match.
+    """
+
+    def __init__(self, expression: str):
+        self.expression = expression
+        self._tokens = tokenize(expression)
+        self._pos = 0
+        self.tree = self._parse_or()
+        if self._pos < len(self._tokens):
+            raise FilterError(f"Unexpected '{self._tokens[self._pos][1]}' in: {expression}")
+        del self._tokens, self._pos
+
+        self.columns = []
+        _collect_columns(self.tree, self.columns)
+
+    def mask(self, df: pd.DataFrame) -> pd.Series:
+        return _evaluate(self.tree, df).fillna(False).astype(bool)
+
+    # Recursive descent: or > and > not > comparison / (group)
+
+    def _parse_or(self):
+        node = self._parse_and()
+        while self._keyword("or"):
+            node = ("or", node, self._parse_and())
+        return node
+
+    def _parse_and(self):
+        node = self._parse_not()
+        while self._keyword("and"):
+            node = ("and", node, self._parse_not())
+        return node
+
+    def _parse_not(self):
+        if self._keyword("not"):
+            return ("not", self._parse_not())
+        return self._parse_comparison()
+
+    def _parse_comparison(self):
+        if self._punctuation("("):
+            node = self._parse_or()
+            self._expect(")")
+            return node
+
+        column = self._next("a column name")[1]
+        if self._keyword("not"):
+            if not self._keyword("in"):
+                raise FilterError(f"Expected 'in' after '{column} not' in: {self.expression}")
+            return ("not", ("in", column, self._parse_list()))
+        if self._keyword("in"):
+            return ("in", column, self._parse_list())
+        if self._keyword("between"):
+            low = self._parse_value()
+            if not self._keyword("and"):
+                raise FilterError(f"Expected 'and' in '{column} between ...' in: {self.expression}")
+            return ("between", column, low, self._parse_value())
+
+        kind, text = self._next(f"an operator after '{column}'")
+        if kind != "op" or text not in COMPARISONS and text != "=":
+            raise FilterError(f"Expected an operator after '{column}', got '{text}' in: {self.expression}")
+        return ("cmp", column, "==" if text == "=" else text, self._parse_value())
+
+    def _parse_list(self) -> list:
+        self._expect("(")
+        values = [self._parse_value()]
+        while self._punctuation(","):
+            values.append(self._parse_value())
+        self._expect(")")
+        return values
+
+    def _parse_value(self):
+        kind, text = self._next("a value")
+        if kind == "string":
+            return text
+        if kind == "word":
+            return _literal(text)
+        raise FilterError(f"Expected a value, got '{text}' in: {self.expression}")
+
+    def _next(self, expected: str) -> tuple[str, str]:
+        if self._pos >= len(self._tokens):
+            raise FilterError(f"Expected {expected} at the end of: {self.expression}")
+        token = self._tokens[self._pos]
+        self._pos += 1
+        return token
+
+    def _keyword(self, name: str) -> bool:
+        if self._pos < len(self._tokens):
+            kind, text = self._tokens[self._pos]
+            if kind == "word" and text.lower() == name:
+                self._pos += 1
+                return True
+        return False
+
+    def _punctuation(self, text: str) -> bool:
+        if self._pos < len(self._tokens) and self._tokens[self._pos] == ("op", text):
+            self._pos += 1
+            return True
+        return False
+
+    def _expect(self, text: str):
+        if not self._punctuation(text):
+            raise FilterError(f"Expected '{text}' in: {self.expression}")
+
+
+def tokenize(expression: str) -> list[tuple[str, str]]:
+    """Split an expression into ("string" | "op" | "word", text) tokens."""
+    tokens = []
+    pos = 0
+    while expression[pos:].strip():
+        match = TOKEN_PATTERN.match(expression, pos)
+        if match is None:
+            raise FilterError(f"Unexpected character at position {pos} in: {expression}")
+        string, op, word = match.groups()
+        if string is not None:
+            tokens.append(("string", re.sub(r"\\(.)", r"\1", string[1:-1])))
+        elif op is not None:
+            tokens.append(("op", op))
+        else:
+            tokens.append(("word", word))
+        pos = match.end()
+    return tokens
+
+
+def quote(value: str) -> str:
+    """Quote a value for use in a filter expression."""
+    return '"' + value.replace("\\", "\\\\").replace('"', '\\"') + '"'
+
+
+def _literal(word: str) -> int | float | str:
+    for convert in (int, float):
+        try:
+            return convert(word)
+        except ValueError:
+            pass
+    return word
+
+
+def _collect_columns(node: tuple, columns: list[str]):
+    if node[0] in ("or", "and"):
+        _collect_columns(node[1], columns)
+        _collect_columns(node[2], columns)
+    elif node[0] == "not":
+        _collect_columns(node[1], columns)
+    elif node[1] not in columns:
+        columns.append(node[1])
+
+
+def _operands(series: pd.Series, values: list) -> tuple[pd.Series, list]:
+    """
+    Make a column and literals comparable: text columns compare numerically
+    with number literals, and date columns compare with date literals.
+    """
+    if all(isinstance(v, (int, float)) for v in values):
+        if not pd.api.types.is_numeric_dtype(series):
+            series = pd.to_numeric(series, errors="coerce")
+    elif series.dtype.kind == "M":
+        try:
+            series, values = pd.to_datetime(series), [pd.Timestamp(v) for v in values]
+        except ValueError:
+            raise FilterError(f"Expected dates to compare with column '{series.name}', got: {values}") from None
+    return series, values
+
+
+def _evaluate(node: tuple, df: pd.DataFrame) -> pd.Series:
+    """Nullable boolean mask for a parsed expression (NA where the result is unknown)."""
+    kind = node[0]
+    if kind == "or":
+        return _evaluate(node[1], df) | _evaluate(node[2], df)
+    if kind == "and":
+        return _evaluate(node[1], df) & _evaluate(node[2], df)
+    if kind == "not":
+        return ~_evaluate(node[1], df)
+
+    column = node[1]
+    try:
+        if kind == "in":
+            series, values = _operands(df[column], node[2])
+            result = series.isin(values)
+        elif kind == "between":
+            series, (low, high) = _operands(df[column], [node[2], node[3]])
+            result = (series >= low) & (series <= high)
+        else:
+            series, (value,) = _operands(df[column], [node[3]])
+            result = COMPARISONS[node[2]](series, value)
+    except TypeError:
+        raise FilterError(f"Can't compare column '{column}' ({df[column].dtype}) with the values given") from None
+    return result.astype("boolean").mask(series.isna())
+
+
+def compile_filters(filters: dict[str, str], available: list[str]) -> dict[str, RowFilter]:
+    """Parse named filter expressions, exiting with an error if one is invalid."""
+    compiled = {}
+    for name, expression in filters.items():
+        try:
+            row_filter = RowFilter(expression)
+        except FilterError as e:
+            print(f"Error: Filter '{name}': {e}")
             sys.exit(1)
 
-    # Determine output filename
-    if output_file is None:
-        output_file = input_path.stem + "_filtered.csv"
+        missing = [c for c in row_filter.columns if c not in available]
+        if missing:
+            print(f"Error: Filter '{name}' uses unknown columns: {', '.join(missing)}")
+            sys.exit(1)
+        compiled[name] = row_filter
+    return compiled
+
+
+def plan_queries(
+    available: list[str],
+    status_filter: str,
+    filters: dict[str, str] | None,
+    input_path: Path,
+    output_file: str,
+    output_format: str
+) -> list[tuple[str | None, str, RowFilter | None]]:
+    """
+    The outputs to produce from one pass over the input.
+
+    Returns (label, output file, row filter) for every named filter, or
+    for the status filter alone (no filter if there's no status column).
+    """
+    if filters:
+        return [
+            (f"{name}: {row_filter.expression}", f"{input_path.stem}_{name}.{output_format}", row_filter)
+            for name, row_filter in compile_filters(filters, available).items()
+        ]
+
+    if "status" not in available:
+        return [(None, output_file, None)]
+    return [(f"status='{status_filter}'", output_file, RowFilter(f"status == {quote(status_filter)}"))]
+
+
+def needed_columns(available: list[str], output_columns: list[str], queries: list) -> list[str]:
+    """Output columns plus the columns the filters read, in file order."""
+    needed = set(output_columns)
+    for _, _, row_filter in queries:
+        if row_filter is not None:
+            needed.update(row_filter.columns)
+    return [c for c in available if c in needed]
+
+
+def apply_query(
+    df: pd.DataFrame,
+    row_filter: RowFilter | None,
+    output_columns: list[str],
+    filter_df: pd.DataFrame | None = None
+) -> pd.DataFrame:
+    """Output columns of the rows that match, with the filter evaluated on `filter_df` if given."""
+    if row_filter is not None:
+        df = df[row_filter.mask(df if filter_df is None else filter_df)]
+    return df[output_columns]
+
+
+def _text_compared_columns(node: tuple, columns: list[str]):
+    if node[0] in ("or", "and"):
+        _text_compared_columns(node[1], columns)
+        _text_compared_columns(node[2], columns)
+    elif node[0] == "not":
+        _text_compared_columns(node[1], columns)
+    else:
+        values = node[2] if node[0] == "in" else list(node[2:]) if node[0] == "between" else [node[3]]
+        if any(isinstance(v, str) for v in values) and node[1] not in columns:
+            columns.append(node[1])
+
+
+def _column_kind(series: pd.Series) -> str | None:
+    values = series.dropna()
+    if values.empty:
+        return None
+    if pd.api.types.is_bool_dtype(series) or series.dtype == object and values.map(type).eq(bool).all():
+        return "bool"
+    if pd.api.types.is_numeric_dtype(series):
+        return "number"
+    return "text"
+
+
+def column_kinds(input_path: Path, queries: list, chunksize: int = 1_000_000) -> dict[str, str]:
+    """
+    How a read of the whole file types the columns that filters compare with text.
+
+    Returns "number", "bool" or "text" for each such column. Chunks and
+    shards read as text are filtered with these types (see
+    typed_for_filtering), so `status == "1"` matches the same rows in
+    every mode, e.g. none on a column pandas reads as numbers. Number
+    literals compare the same on text, so their columns aren't checked.
+    Reading stops once every column has shown a text value, which for
+    most text columns is the first chunk.
+    """
+    columns = []
+    for _, _, row_filter in queries:
+        if row_filter is not None:
+            _text_compared_columns(row_filter.tree, columns)
+    if not columns:
+        return {}
+
+    kinds = dict.fromkeys(columns)
+    with pd.read_csv(input_path, usecols=columns, chunksize=chunksize) as reader:
+        for chunk in reader:
+            for column in columns:
+                kind = _column_kind(chunk[column])
+                if kinds[column] is None or kind is not None and kind != kinds[column]:
+                    kinds[column] = kind if kinds[column] is None else "text"
+            if all(kind == "text" for kind in kinds.values()):
+                break
+    return {column: kind or "text" for column, kind in kinds.items()}
+
+
+def typed_for_filtering(df: pd.DataFrame, kinds: dict[str, str]) -> pd.DataFrame:
+    """`df`, read as text, with the columns in `kinds` converted to their number / bool types."""
+    converted = {}
+    for column, kind in kinds.items():
+        if kind == "number":
+            converted[column] = pd.to_numeric(df[column], errors="coerce")
+        elif kind == "bool":
+            converted[column] = df[column].str.lower().map({"true": True, "false": False})
+    return df.assign(**converted) if converted else df
+
 
-    # Save result
-    df_filtered.to_csv(output_file, index=False)
+def report(total_rows: int, queries: list, kept_rows: list[int], previews: list[pd.DataFrame | None]):
+    """Print row counts per output, and a preview when there's a single output."""
+    print(f"Total rows: {total_rows}")
+    report_filters(queries, kept_rows)
+    report_outputs(queries, kept_rows, previews)
+
+
+def report_filters(queries: list, kept_rows: list[int]):
+    """Rows kept by a single filter (multiple filters are listed with their outputs)."""
+    if len(queries) > 1:
+        return
+    if queries[0][0] is None:
+        print("Warning: No 'status' column found, skipping filter")
+    else:
+        print(f"After filtering ({queries[0][0]}): {kept_rows[0]} rows")
+
+
+def report_outputs(queries: list, kept_rows: list[int], previews: list[pd.DataFrame | None]):
+    if len(queries) > 1:
+        print("\nOutputs:")
+        for (label, output_file, _), kept in zip(queries, kept_rows):
+            print(f"  {output_file}: {kept} rows ({label})")
+        return
+
+    output_file = queries[0][1]
     print(f"\nOutput written to: {output_file}")
-    print(f"Final row count: {len(df_filtered)}")
+    print(f"Final row count: {kept_rows[0]}")
 
-    # Show preview
     print("\nPreview (first 5 rows):")
-    print(df_filtered.head().to_string())
+    print(previews[0].head().to_string() if previews[0] is not None and len(previews[0]) else "(no rows)")
+
+
+def process_parquet(
+    input_path: Path,
+    status_filter: str,
+    columns: list[str] | None,
+    output_file: str,
+    output_format: str,
+    filters: dict[str, str] | None = None
+):
+    """
+    Same as process_csv for a Parquet input, with the status filter pushed down.
+
+    Only the needed columns are read, and for the status filter, row
+    groups whose min/max statistics exclude `status_filter` are skipped
+    without being decoded. Named filters are evaluated after one read, as
+    is the status filter on a column that isn't text: pushdown would
+    compare in the column's type, so `--status 3` would match an int
+    column that never matches the same data read from CSV.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    parquet_file = pq.ParquetFile(input_path)
+    available = parquet_file.schema_arrow.names
+    print(f"Reading: {input_path} (Parquet, {parquet_file.metadata.num_rows} rows)")
+    print(f"Available columns: {', '.join(available)}")
+
+    output_columns = select_columns(available, columns)
+    queries = plan_queries(available, status_filter, filters, input_path, output_file, output_format)
+
+    pushdown = False
+    if not filters and queries[0][2] is not None:
+        status_type = parquet_file.schema_arrow.field("status").type
+        if pa.types.is_dictionary(status_type):
+            status_type = status_type.value_type
+        pushdown = pa.types.is_string(status_type) or pa.types.is_large_string(status_type)
+
+    if not pushdown:
+        df = pd.read_parquet(input_path, columns=needed_columns(available, output_columns, queries))
+        results = [apply_query(df, row_filter, output_columns) for _, _, row_filter in queries]
+    else:
+        results = [pd.read_parquet(
+            input_path,
+            columns=output_columns,
+            filters=[("status", "==", status_filter)]
+        )]
+
+    for (_, query_output, _), df_filtered in zip(queries, results):
+        write_output(df_filtered, query_output, output_format)
+
+    report(parquet_file.metadata.num_rows, queries, [len(r) for r in results], [r.head() for r in results])
+
+
+def process_csv_streaming(
+    input_path: Path,
+    status_filter: str,
+    columns: list[str] | None,
+    output_file: str,
+    chunksize: int,
+    output_format: str = "csv",
+    engine: str | None = None,
+    filters: dict[str, str] | None = None
+):
+    """
+    Same as process_csv, but reads `chunksize` rows at a time.
+
+    Only the selected columns (plus the columns filtered on) are parsed,
+    and filtered rows are appended to each output chunk by chunk.
+
+    Each chunk would otherwise infer its own column types (a chunk with
+    a blank score reads the column as float and writes 1.0 where others
+    write 1), so CSV output is read as text: values are written back as
+    they appear in the input, whatever the chunk size. Filters still see
+    the types a read of the whole file would give (see column_kinds), so
+    they keep the same rows as the in-memory path; only the formatting of
+    numbers can differ from it. Columnar output is read into Arrow-backed
+    (nullable) columns instead, to keep their types, with the columns
+    that are text in the whole file read as text in every chunk.
+    """
+    # Read just the header to plan which columns to parse
+    available = list(pd.read_csv(input_path, nrows=0).columns)
+    print(f"Reading: {input_path} (streaming, {chunksize:,} rows per chunk)")
+    print(f"Available columns: {', '.join(available)}")
+
+    output_columns = select_columns(available, columns)
+    queries = plan_queries(available, status_filter, filters, input_path, output_file, output_format)
+    usecols = needed_columns(available, output_columns, queries)
+
+    # The Arrow CSV reader can't read in chunks, but its column types can be kept
+    if engine == "pyarrow":
+        print("Note: --engine pyarrow doesn't support --chunksize, using the default parser")
+    kinds = column_kinds(input_path, queries, chunksize)
+    if output_format == "csv":
+        read_kwargs = {"dtype": str}
+    else:
+        read_kwargs = {"dtype_backend": "pyarrow", "dtype": {c: str for c, kind in kinds.items() if kind == "text"}}
+
+    total_rows = 0
+    kept_rows = [0] * len(queries)
+    previews = [[] for _ in queries]
+    with ExitStack() as stack:
+        writers = [
+            stack.enter_context(ChunkWriter(query_output, output_format, output_columns))
+            for _, query_output, _ in queries
+        ]
+        for chunk in pd.read_csv(input_path, usecols=usecols, chunksize=chunksize, **read_kwargs):
+            total_rows += len(chunk)
+            filter_df = typed_for_filtering(chunk, kinds) if output_format == "csv" else chunk
+            for q, (_, _, row_filter) in enumerate(queries):
+                df_filtered = apply_query(chunk, row_filter, output_columns, filter_df)
+                writers[q].write(df_filtered)
+                if kept_rows[q] < 5:
+                    previews[q].append(df_filtered.head(5))
+                kept_rows[q] += len(df_filtered)
+            print(f"  Processed {total_rows:,} rows, kept {', '.join(f'{kept:,}' for kept in kept_rows)}")
+
+    report(total_rows, queries, kept_rows, [pd.concat(p) if p else None for p in previews])
+
+
+def shard_ranges(input_path: Path, shards: int) -> list[tuple[int, int]]:
+    """
+    Split the rows after the header into about `shards` byte ranges.
+
+    Every boundary is moved forward to just after a newline, so each
+    range holds whole rows.
+    """
+    size = input_path.stat().st_size
+    with open(input_path, "rb") as f:
+        f.readline()  # header
+        data_start = f.tell()
+
+        boundaries = [data_start]
+        step = max(1, (size - data_start) // shards)
+        for target in range(data_start + step, size, step):
+            if target <= boundaries[-1]:
+                continue
+            f.seek(target - 1)
+            f.readline()  # finish the row that `target` falls in
+            if f.tell() >= size:
+                break
+            boundaries.append(f.tell())
+        boundaries.append(size)
+
+    return [(start, end) for start, end in zip(boundaries, boundaries[1:]) if end > start]
+
+
+def filter_shard(
+    input_path: Path,
+    start: int,
+    end: int,
+    header: list[str],
+    row_filters: list[RowFilter | None],
+    output_columns: list[str],
+    shard_files: list[str],
+    output_format: str = "csv",
+    kinds: dict[str, str] | None = None
+) -> tuple[int, list[int], list[pd.DataFrame]]:
+    """
+    Filter one byte range of the input into one shard file per filter.
+
+    Runs in a worker process. For CSV output, values are read as text so
+    every shard writes them back as they appear in the input (no header
+    row), and filters run on the column types of a whole-file read
+    (`kinds`, from column_kinds), so they keep the same rows as every
+    other mode. Otherwise the shard keeps its inferred column types (text
+    for columns that are text in the whole file) and is written as
+    Feather, for process_csv_parallel to merge.
+
+    Returns:
+        (rows read, rows kept per filter, first rows kept per filter for the preview)
+    """
+    with open(input_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    usecols = needed_columns(header, output_columns, [(None, None, row_filter) for row_filter in row_filters])
+    kinds = kinds or {}
+    if output_format == "csv":
+        read_kwargs = {"dtype": str}
+    else:
+        read_kwargs = {"dtype_backend": "pyarrow", "dtype": {c: str for c, kind in kinds.items() if kind == "text"}}
+    df = pd.read_csv(io.BytesIO(data), header=None, names=header, usecols=usecols, **read_kwargs)
+    filter_df = typed_for_filtering(df, kinds) if output_format == "csv" else df
+
+    kept_rows, previews = [], []
+    for row_filter, shard_file in zip(row_filters, shard_files):
+        df_filtered = apply_query(df, row_filter, output_columns, filter_df)
+        if output_format == "csv":
+            df_filtered.to_csv(shard_file, index=False, header=False)
+        else:
+            df_filtered.reset_index(drop=True).to_feather(shard_file)
+        kept_rows.append(len(df_filtered))
+        previews.append(df_filtered.head())
+    return len(df), kept_rows, previews
+
+
+def merge_columnar_shards(shard_files: list[str], output_file: str, output_format: str, columns: list[str]):
+    """
+    Concatenate Feather shards in order into one Parquet or Feather file.
+
+    Shards may infer different types for a column (e.g. int64 in one,
+    double in another); the types are widened to a common schema, and
+    columns with no common type are stored as strings. The merged file is
+    written to a temporary file first and then renamed to `output_file`.
+    """
+    import pyarrow as pa
+    import pyarrow.feather as feather
+    import pyarrow.parquet as pq
+
+    schemas = [feather.read_table(shard_file, memory_map=True).schema for shard_file in shard_files]
+    try:
+        schema = pa.unify_schemas(schemas, promote_options="permissive")
+    except (pa.ArrowTypeError, pa.ArrowInvalid):
+        schema = pa.schema([(column, pa.string()) for column in columns])
+    # The first shard's pandas metadata describes its own types, not the widened ones
+    schema = schema.remove_metadata()
+
+    tmp_file = f"{output_file}.tmp"
+    try:
+        if output_format == "parquet":
+            writer = pq.ParquetWriter(tmp_file, schema)
+        else:
+            writer = pa.ipc.new_file(tmp_file, schema)
+        with writer:
+            for shard_file in shard_files:
+                writer.write_table(feather.read_table(shard_file, memory_map=True).cast(schema))
+        os.replace(tmp_file, output_file)
+    finally:
+        if os.path.exists(tmp_file):
+            os.remove(tmp_file)
+
+
+def process_csv_parallel(
+    input_path: Path,
+    status_filter: str,
+    columns: list[str] | None,
+    output_file: str,
+    workers: int,
+    output_format: str = "csv",
+    filters: dict[str, str] | None = None
+):
+    """
+    Same as process_csv, but filters byte-range shards of the file on `workers` processes.
+
+    Shard boundaries are raw newlines. One inside a quoted field leaves a
+    shard ending in an open quote, which fails to parse; the file is then
+    filtered with process_csv_streaming instead.
+    """
+    header = list(pd.read_csv(input_path, nrows=0).columns)
+    size = input_path.stat().st_size
+    shards = shard_ranges(input_path, max(workers, -(-size // SHARD_BYTES)))
+    print(f"Reading: {input_path} ({len(shards)} shards on {workers} workers)")
+    print(f"Available columns: {', '.join(header)}")
+
+    output_columns = select_columns(header, columns)
+    queries = plan_queries(header, status_filter, filters, input_path, output_file, output_format)
+    row_filters = [row_filter for _, _, row_filter in queries]
+    kinds = column_kinds(input_path, queries)
+
+    # Shard outputs go next to the final outputs, then get concatenated in order
+    shard_dir = tempfile.mkdtemp(prefix=".shards-", dir=Path(output_file).resolve().parent)
+    try:
+        # shard_files[n][q]: shard n's output for query q
+        shard_files = [
+            [os.path.join(shard_dir, f"{n:05d}-{q}.{output_format}") for q in range(len(queries))]
+            for n in range(len(shards))
+        ]
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(
+                    filter_shard, input_path, start, end, header,
+                    row_filters, output_columns, files, output_format, kinds
+                )
+                for (start, end), files in zip(shards, shard_files)
+            ]
+            try:
+                results = [future.result() for future in futures]
+            except pd.errors.ParserError:
+                for future in futures:
+                    future.cancel()
+                results = None
+
+        if results is None:
+            print("Note: A quoted field spans a shard boundary, streaming the file on one process instead")
+            process_csv_streaming(
+                input_path, status_filter, columns, output_file, FALLBACK_CHUNKSIZE, output_format, None, filters
+            )
+            return
+
+        for q, (_, query_output, _) in enumerate(queries):
+            query_shards = [files[q] for files in shard_files]
+            if output_format == "csv":
+                with open(query_output, "wb") as out:
+                    out.write(pd.DataFrame(columns=output_columns).to_csv(index=False).encode())
+                    for shard_file in query_shards:
+                        with open(shard_file, "rb") as shard:
+                            shutil.copyfileobj(shard, out)
+            else:
+                merge_columnar_shards(query_shards, query_output, output_format, output_columns)
+    finally:
+        shutil.rmtree(shard_dir, ignore_errors=True)
+
+    total_rows = sum(rows for rows, _, _ in results)
+    kept_rows = [sum(kept[q] for _, kept, _ in results) for q in range(len(queries))]
+    previews = []
+    for q in range(len(queries)):
+        heads = [heads[q] for _, kept, heads in results if kept[q]]
+        # Shard row numbers restart at 0, so renumber the preview
+        previews.append(pd.concat(heads).head().reset_index(drop=True) if heads else None)
+
+    report(total_rows, queries, kept_rows, previews)
+
+
+def index_path(input_path: Path, column: str) -> Path:
+    return input_path.with_name(f"{input_path.name}.{column}.idx")
+
+
+def offsets_path(index_file: Path) -> Path:
+    """The row offsets that go with an index's key table (input.csv.COLUMN.idx.npy)."""
+    return index_file.with_name(index_file.name + ".npy")
+
+
+def _newline_blocks(f, position: int):
+    """(file offset, bytes) blocks of about INDEX_BLOCK_BYTES, each ending after a newline or at EOF."""
+    carry = b""
+    while True:
+        block = f.read(INDEX_BLOCK_BYTES)
+        data = carry + block
+        cut = data.rfind(b"\n") + 1 if block else len(data)
+        if cut:
+            yield position, data[:cut]
+            position += cut
+        carry = data[cut:]
+        if not block:
+            return
+
+
+def build_index(input_path: Path, column: str, offsets_file: Path) -> dict[str, np.ndarray] | None:
+    """
+    Scan the file once for every row's byte range and its value in `column`.
+
+    Rows are found by raw newlines (like --workers shards), so the index
+    can't be built if quoted fields contain line breaks; returns None then.
+    Each block's rows are spilled to a temporary file as they are numbered,
+    so memory use doesn't grow with the file's row count.
+
+    Writes offsets_file: an uncompressed (rows, 2) .npy of (delta, length),
+    grouped by value and in file order within a group. delta is the gap
+    from the previous row start of the group (0 for its first row), which
+    keeps the offsets to uint32 unless rows or gaps reach 4 GB.
+
+    Returns:
+        values: distinct column values
+        bounds: rows of values[i] are offsets[bounds[i]:bounds[i + 1]]
+        first_starts: byte offset of the first row of each value
+        columns, dtypes: the type a full read infers for each column
+        rows, size, mtime_ns: the row count, and the file's stat when indexed
+        version: INDEX_VERSION
+    """
+    stat = input_path.stat()
+    header = list(pd.read_csv(input_path, nrows=0).columns)
+    value_codes: dict[str, int] = {}
+    counts = np.zeros(0, dtype=np.int64)
+    first_starts = np.zeros(0, dtype=np.uint64)
+    last_starts = np.zeros(0, dtype=np.uint64)
+    dtypes = {}
+    widest = 0
+
+    with open(input_path, "rb") as f, tempfile.TemporaryFile(dir=offsets_file.parent) as spill:
+        for position, data in _newline_blocks(f, len(f.readline())):
+            newlines = np.flatnonzero(np.frombuffer(data, dtype=np.uint8) == ord("\n"))
+            row_starts = np.concatenate([[0], newlines + 1])
+            if row_starts[-1] == len(data):
+                row_starts = row_starts[:-1]  # the block ends with a newline
+            lengths = np.diff(np.append(row_starts, len(data))).astype(np.uint64)
+            starts = (row_starts + position).astype(np.uint64)
+
+            try:
+                keys = pd.read_csv(
+                    io.BytesIO(data), header=None, names=header, usecols=[column], dtype=str,
+                    keep_default_na=False, skip_blank_lines=False
+                )[column]
+                typed = pd.read_csv(io.BytesIO(data), header=None, names=header)
+            except pd.errors.ParserError:
+                return None
+            if len(keys) != len(starts):
+                return None
+
+            # Column types of a full read, widened block by block
+            if len(typed):
+                for name, dtype in typed.dtypes.items():
+                    dtypes[name] = _common_dtype(dtypes.get(name, dtype), dtype)
+
+            # Number each distinct value in `column` (blank lines read as empty)
+            block_codes, uniques = pd.factorize(keys.fillna(""))
+            mapping = np.array([value_codes.setdefault(value, len(value_codes)) for value in uniques], dtype=np.int64)
+            codes = mapping[block_codes]
+            grow = len(value_codes) - len(counts)
+            counts = np.concatenate([counts, np.zeros(grow, dtype=np.int64)])
+            first_starts = np.concatenate([first_starts, np.zeros(grow, dtype=np.uint64)])
+            last_starts = np.concatenate([last_starts, np.zeros(grow, dtype=np.uint64)])
+
+            # Group the block's rows by value; each row's delta is the gap from
+            # the previous row with that value, which may be in an earlier block
+            order = np.argsort(codes, kind="stable")
+            codes, starts, lengths = codes[order], starts[order], lengths[order]
+            group_first = np.flatnonzero(np.diff(codes, prepend=-1))
+            group_sizes = np.diff(np.append(group_first, len(codes)))
+            group_codes = codes[group_first]
+            new = counts[group_codes] == 0
+            first_starts[group_codes[new]] = starts[group_first[new]]
+            previous = np.empty_like(starts)
+            previous[1:] = starts[:-1]
+            previous[group_first] = np.where(new, starts[group_first], last_starts[group_codes])
+            last_starts[group_codes] = starts[group_first + group_sizes - 1]
+            counts[group_codes] += group_sizes
+
+            records = np.empty(len(codes), dtype=INDEX_SPILL_DTYPE)
+            records["code"], records["delta"], records["length"] = codes, starts - previous, lengths
+            widest = max(widest, int(records["delta"].max()), int(lengths.max()))
+            records.tofile(spill)
+
+        # Write the spilled rows to their group's place in the offsets, in file order
+        rows = int(counts.sum())
+        bounds = np.concatenate([[0], np.cumsum(counts)])
+        offset_dtype = np.uint32 if widest < 2**32 else np.uint64
+        if rows == 0:
+            with open(offsets_file, "wb") as out:
+                np.save(out, np.empty((0, 2), dtype=offset_dtype))
+        else:
+            offsets = np.lib.format.open_memmap(offsets_file, mode="w+", dtype=offset_dtype, shape=(rows, 2))
+            cursors = bounds[:-1].copy()
+            spill.seek(0)
+            while len(records := np.fromfile(spill, dtype=INDEX_SPILL_DTYPE, count=INDEX_SPILL_ROWS)):
+                records = records[np.argsort(records["code"], kind="stable")]
+                codes = records["code"]
+                group_first = np.flatnonzero(np.diff(codes, prepend=-1))
+                group_sizes = np.diff(np.append(group_first, len(codes)))
+                rank = np.arange(len(codes)) - np.repeat(group_first, group_sizes)
+                positions = cursors[codes] + rank
+                offsets[positions, 0] = records["delta"]
+                offsets[positions, 1] = records["length"]
+                cursors[codes[group_first]] += group_sizes
+            offsets.flush()
+            del offsets
+
+    return {
+        "values": np.array(list(value_codes), dtype=str),
+        "bounds": bounds,
+        "first_starts": first_starts,
+        "columns": np.array(list(dtypes), dtype=str),
+        "dtypes": np.array([str(dtype) for dtype in dtypes.values()], dtype=str),
+        "rows": np.array(rows),
+        "size": np.array(stat.st_size),
+        "mtime_ns": np.array(stat.st_mtime_ns),
+        "version": np.array(INDEX_VERSION)
+    }
+
+
+def _common_dtype(a, b):
+    """The type pandas infers for a column that reads as `a` in some rows and `b` in others."""
+    if a == b:
+        return a
+    if a.kind in "iuf" and b.kind in "iuf":
+        return np.result_type(a, b)
+    # Mixed numbers and text, or booleans and blanks: a full read keeps the column as text
+    return pd.api.types.pandas_dtype("str")
+
+
+def _load_offsets(path: Path, rows: int) -> np.ndarray:
+    # A zero-length array can't be memory-mapped
+    return np.load(path, mmap_mode="r" if rows else None)
+
+
+def load_index(input_path: Path, column: str) -> tuple[dict[str, np.ndarray], np.ndarray] | None:
+    """
+    The sidecar index for `column`, built (or rebuilt if the file changed) as needed.
+
+    Returns the small key table, read in full, and the row offsets,
+    memory-mapped so a lookup only reads the groups it matches.
+    """
+    path = index_path(input_path, column)
+    rows_path = offsets_path(path)
+    stat = input_path.stat()
+    if path.exists():
+        with np.load(path) as data:
+            index = dict(data)
+        # Indexes without a version come from an older layout
+        current = (
+            int(index.get("version", 0)) == INDEX_VERSION
+            and int(index["size"]) == stat.st_size and int(index["mtime_ns"]) == stat.st_mtime_ns
+        )
+        if current and rows_path.exists():
+            offsets = _load_offsets(rows_path, int(index["rows"]))
+            if len(offsets) == int(index["rows"]):
+                return index, offsets
+        print(f"Index {path} is out of date, rebuilding")
+    else:
+        print(f"Building index {path}")
+
+    # Write to temporary files first so readers never see a partial index;
+    # the key table goes last, since its stat is what marks the pair current
+    tmp_rows_path = rows_path.with_name(rows_path.name + ".tmp")
+    try:
+        index = build_index(input_path, column, tmp_rows_path)
+        if index is None:
+            print(f"Warning: Can't index {input_path}: some rows span several lines")
+            return None
+        os.replace(tmp_rows_path, rows_path)
+    finally:
+        tmp_rows_path.unlink(missing_ok=True)
+
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        np.savez(f, **index)
+    os.replace(tmp_path, path)
+    return index, _load_offsets(rows_path, int(index["rows"]))
+
+
+def index_keys(node: tuple, column: str) -> set[str] | None:
+    """
+    Values of `column` that a filter can match, or None if any value might.
+
+    Uses `column == value` and `column in (...)` terms, through and / or.
+    """
+    kind = node[0]
+    if kind == "and":
+        left, right = index_keys(node[1], column), index_keys(node[2], column)
+        if left is None or right is None:
+            return left if right is None else right
+        return left & right
+    if kind == "or":
+        left, right = index_keys(node[1], column), index_keys(node[2], column)
+        return None if left is None or right is None else left | right
+    if node[1] != column or not (kind == "in" or kind == "cmp" and node[2] == "=="):
+        return None
+
+    values = node[2] if kind == "in" else [node[3]]
+    # Index keys are the raw text of the field, and a number may be written
+    # several ways (1, 1.0, 01), so only text values can be looked up
+    if any(isinstance(v, (int, float)) for v in values):
+        return None
+    return set(values)
+
+
+def read_indexed_rows(
+    input_path: Path,
+    column: str,
+    available: list[str],
+    queries: list
+) -> tuple[Path | io.BytesIO, int | None, dict[str, str]]:
+    """
+    The header plus only the rows the queries can match, read via the sidecar index.
+
+    Returns:
+        (CSV source for pd.read_csv, total rows in the file, column types of a full read) or
+        (input_path, None, {}) when the index can't narrow the read
+    """
+    if column not in available:
+        print(f"Warning: Can't index on '{column}', no such column")
+        return input_path, None, {}
+
+    keys = set()
+    for _, _, row_filter in queries:
+        query_keys = index_keys(row_filter.tree, column) if row_filter is not None else None
+        if query_keys is None:
+            print(f"Note: Not every filter selects values of '{column}', reading the whole file")
+            return input_path, None, {}
+        keys |= query_keys
+
+    loaded = load_index(input_path, column)
+    if loaded is None:
+        return input_path, None, {}
+    index, offsets = loaded
+
+    # Only the matched groups of the memory-mapped offsets are read
+    bounds, first_starts = index["bounds"], index["first_starts"]
+    starts, lengths = [np.empty(0, dtype=np.int64)], [np.empty(0, dtype=np.int64)]
+    for i, value in enumerate(index["values"]):
+        if value in keys:
+            group = np.asarray(offsets[bounds[i]:bounds[i + 1]], dtype=np.int64)
+            starts.append(int(first_starts[i]) + np.cumsum(group[:, 0]))
+            lengths.append(group[:, 1])
+    starts, lengths = np.concatenate(starts), np.concatenate(lengths)
+    order = np.argsort(starts, kind="stable")
+    starts, lengths = starts[order], lengths[order]
+    total_rows = int(index["rows"])
+    print(f"Index lookup: {len(starts):,} of {total_rows:,} rows match {column} in ({', '.join(sorted(keys))})")
+
+    # Scattered reads only pay off for a selective lookup
+    if lengths.sum() > int(index["size"]) / 2:
+        return input_path, None, {}
+
+    # Coalesce adjacent rows into runs, then copy each run out of the memory map
+    ends = starts + lengths
+    breaks = np.flatnonzero(starts[1:] != ends[:-1]) + 1
+    run_starts = starts[np.concatenate([[0], breaks])] if len(starts) else starts
+    run_ends = ends[np.concatenate([breaks - 1, [len(starts) - 1]])] if len(starts) else ends
+
+    with open(input_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        header = mm[:mm.find(b"\n") + 1]
+        rows = [mm[start:end] for start, end in zip(run_starts, run_ends)]
+
+    # A last row without a trailing newline must not run into the next one
+    data = b"".join(row if row.endswith(b"\n") else row + b"\n" for row in rows)
+    return io.BytesIO(header + data), total_rows, dict(zip(index["columns"], index["dtypes"]))
 
 
 def show_usage():
@@ -87,12 +1292,26 @@ def show_usage():
     print("  --status VALUE     Filter rows where status column = VALUE (default: 'active')")
     print("  --columns COL1,COL2  Comma-separated list of columns to include")
     print("  --output FILE      Output filename (default: input_filtered.csv)")
+    print("  --chunksize N      Stream the file N rows at a time (for files larger than memory)")
+    print("  --workers N        Filter in parallel on N processes")
+    print("  --format FORMAT    Output format: csv, parquet or feather (default: from --output extension)")
+    print("  --engine ENGINE    c (default) or pyarrow: parse with the Arrow CSV reader into Arrow-backed columns")
+    print("  --filter NAME=EXPR Write rows matching EXPR to input_NAME.csv instead of")
+    print("                     filtering by status (repeatable; all filters share one read)")
+    print("  --index COLUMN     Keep a sidecar index on COLUMN and read only matching rows")
     print("")
     print("Examples:")
     print("  uv run csv-processor.py users.csv")
     print("  uv run csv-processor.py users.csv --status inactive")
     print("  uv run csv-processor.py users.csv --status active --columns name,email")
     print("  uv run csv-processor.py users.csv --columns id,name,department --output team.csv")
+    print("  uv run csv-processor.py export.csv --status active --chunksize 500000")
+    print("  uv run csv-processor.py export.csv --status active --workers 8")
+    print("  uv run csv-processor.py export.csv --engine pyarrow --output active.parquet")
+    print("  uv run csv-processor.py export.parquet --status active --format feather")
+    print('  uv run csv-processor.py users.csv --filter "eng=department == Engineering and status == active" \\')
+    print('                                    --filter "early=joined_date < 2023-06-01 or id in (1, 2, 3)"')
+    print("  uv run csv-processor.py export.csv --status pending --index status")
 
 
 if __name__ == "__main__":
@@ -104,6 +1323,12 @@ if __name__ == "__main__":
     status_filter = "active"
     columns = None
     output_file = None
+    chunksize = None
+    workers = None
+    output_format = None
+    engine = None
+    filters = {}
+    index_column = None
 
     # Parse arguments
     args = sys.argv[2:]
@@ -118,7 +1343,43 @@ if __name__ == "__main__":
         elif args[i] == "--output" and i + 1 < len(args):
             output_file = args[i + 1]
             i += 2
+        elif args[i] == "--chunksize" and i + 1 < len(args):
+            chunksize = int(args[i + 1])
+            i += 2
+        elif args[i] == "--workers" and i + 1 < len(args):
+            workers = int(args[i + 1])
+            i += 2
+        elif args[i] == "--format" and i + 1 < len(args):
+            output_format = args[i + 1]
+            i += 2
+        elif args[i] == "--engine" and i + 1 < len(args):
+            engine = args[i + 1]
+            if engine not in ENGINES:
+                print(f"Error: Unknown engine: {engine} (expected {' or '.join(ENGINES)})")
+                sys.exit(1)
+            i += 2
+        elif args[i] == "--filter" and i + 1 < len(args):
+            name, _, expression = args[i + 1].partition("=")
+            name = name.strip()
+            if not re.fullmatch(r"[A-Za-z0-9_-]+", name) or not expression.strip():
+                print(f"Error: Expected --filter NAME=EXPRESSION, got: {args[i + 1]}")
+                sys.exit(1)
+            filters[name] = expression
+            i += 2
+        elif args[i] == "--index" and i + 1 < len(args):
+            index_column = args[i + 1]
+            i += 2
         else:
             i += 1
 
-    process_csv(input_file, status_filter, columns, output_file)
+    try:
+        process_csv(
+            input_file, status_filter, columns, output_file, chunksize,
+            workers, output_format, engine, filters, index_column
+        )
+    except FilterError as e:
+        print(f"Error: {e}")
+        sys.exit(1)
+    except pd.errors.ParserError as e:
+        print(f"Error: Can't parse {input_file}: {e}")
+        sys.exit(1)
@@ -1,6 +1,6 @@
 # /// script
 # requires-python = ">=3.11"
-# dependencies = ["openai"]
+# dependencies = ["openai", "httpx"]
 # ///
 """
 Meeting Notes to Structured Data
@@ -32,8 +32,15 @@ DEMO_MODE = not os.getenv("OPENAI_API_KEY")
 if DEMO_MODE:
     print("Note: OPENAI_API_KEY not set. Running in demo mode with simple extraction.")
 else:
+    import httpx
     from openai import OpenAI
 
+# OpenAI client settings: the SDK retries 429s and transient errors with
+# jittered exponential backoff, honoring the server's Retry-After header
+MAX_RETRIES = 5
+REQUEST_TIMEOUT_SECONDS = 60
+_client = None
+
 
 SYSTEM_PROMPT = """You are a meeting notes parser. Extract action items from meeting notes.
 
@@ -53,11 +60,21 @@ Priority rules:
 Output a JSON array of action items. Only output valid JSON, nothing else."""
 
 
+def get_client() -> "OpenAI":
+    """Shared OpenAI client with a small keep-alive connection pool."""
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            max_retries=MAX_RETRIES,
+            timeout=REQUEST_TIMEOUT_SECONDS,
+            http_client=httpx.Client(limits=httpx.Limits(max_connections=10, max_keepalive_connections=5))
+        )
+    return _client
+
+
 def parse_with_llm(notes: str) -> list[dict]:
     """Use OpenAI to parse meeting notes into structured data."""
-    client = OpenAI()
-
-    response = client.chat.completions.create(
+    response = get_client().chat.completions.create(
         model="gpt-4o-mini",
         messages=[
             {"role": "system", "content": SYSTEM_PROMPT},
@@ -0,0 +1,111 @@
+"""
+Semantic Answer Cache
+
+In-memory cache of generated answers, looked up by question similarity:
+1. A new question hits if its embedding is within a cosine threshold
+   of a previously answered question
+2. Entries expire after a TTL
+3. The oldest entries are evicted beyond a maximum size
+4. Everything is dropped when the document corpus changes
+"""
+
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+
+class SemanticAnswerCache:
+    """
+    Answer cache keyed by question embeddings.
+
+    Question embeddings are stored as pre-normalized rows of a matrix,
+    so a lookup is one matrix-vector product over all live entries.
+    """
+
+    def __init__(self, threshold: float = 0.95, ttl_seconds: float = 3600, max_entries: int = 1000):
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.corpus_version: Optional[str] = None
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._clear()
+
+    def _clear(self):
+        self._vectors = np.empty((0, 0), dtype=np.float32)
+        self._answers: List[Dict[str, Any]] = []
+        self._created: List[float] = []
+
+    def set_corpus_version(self, version: str):
+        """Record the current corpus version, invalidating all answers if it changed."""
+        with self._lock:
+            if version != self.corpus_version:
+                self._clear()
+                self.corpus_version = version
+
+    def invalidate(self):
+        """Drop every cached answer."""
+        with self._lock:
+            self._clear()
+
+    def _expire(self, now: float):
+        """Drop entries older than the TTL (entries are kept in insertion order)."""
+        expired = 0
+        while expired < len(self._created) and now - self._created[expired] > self.ttl_seconds:
+            expired += 1
+        if expired:
+            self._vectors = self._vectors[expired:]
+            self._answers = self._answers[expired:]
+            self._created = self._created[expired:]
+
+    def get(self, embedding: List[float]) -> Optional[Dict[str, Any]]:
+        """Return the cached answer for the most similar question above the threshold, if any."""
+        query = _normalize(embedding)
+        with self._lock:
+            self._expire(time.time())
+            if self._answers and self._vectors.shape[1] == query.shape[0]:
+                similarities = self._vectors @ query
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.threshold:
+                    self.hits += 1
+                    return self._answers[best]
+            self.misses += 1
+            return None
+
+    def put(self, embedding: List[float], answer: Dict[str, Any]):
+        """Cache an answer for a question embedding, evicting the oldest entries if full."""
+        vector = _normalize(embedding)
+        with self._lock:
+            self._expire(time.time())
+            if not self._answers:
+                self._vectors = vector[np.newaxis, :]
+            else:
+                self._vectors = np.vstack([self._vectors, vector])
+            self._answers.append(answer)
+            self._created.append(time.time())
+
+            overflow = len(self._answers) - self.max_entries
+            if overflow > 0:
+                self._vectors = self._vectors[overflow:]
+                self._answers = self._answers[overflow:]
+                self._created = self._created[overflow:]
+
+    def stats(self) -> Dict[str, float]:
+        """Hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._answers),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0
+        }
+
+
+def _normalize(embedding: List[float]) -> np.ndarray:
+    vector = np.asarray(embedding, dtype=np.float32)
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
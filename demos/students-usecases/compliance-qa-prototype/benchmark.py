@@ -0,0 +1,194 @@
+"""
+Offline RAG Benchmark
+
+Load-tests the compliance API without real OpenAI calls:
+1. Starts mock_openai.py (deterministic embeddings/chat with artificial latency)
+2. Starts main.app against it, with a fresh temporary vector store and caches
+3. Sends questions to /api/ask at a fixed concurrency
+4. Reports throughput, p50/p95/p99 latency and a per-stage breakdown
+
+Usage:
+    python benchmark.py
+    python benchmark.py --requests 500 --concurrency 50 --chat-latency-ms 800
+    python benchmark.py --backend numpy --answer-cache --repeat 5
+"""
+
+import argparse
+import asyncio
+import math
+import os
+import sys
+import tempfile
+import threading
+import time
+from typing import Dict, List, Tuple
+
+QUESTION_TEMPLATES = [
+    "How does your product ensure that only authorized users can access administrative functions?",
+    "What kind of audit logging and monitoring capabilities does your product have?",
+    "How does your product protect sensitive data with encryption?",
+    "Do you enforce multi-factor authentication for privileged accounts?",
+    "How are access rights reviewed and revoked when employees leave?",
+    "What is your process for detecting and responding to security incidents?",
+    "How do you manage and maintain an inventory of hardware and software assets?",
+    "Which cryptographic controls do you apply to data in transit?"
+]
+
+
+def build_questions(count: int, repeat: int) -> List[str]:
+    """`count` questions, each distinct one asked `repeat` times."""
+    distinct = max(1, count // repeat)
+    questions = [
+        f"{QUESTION_TEMPLATES[i % len(QUESTION_TEMPLATES)]} (customer {i})"
+        for i in range(distinct)
+    ]
+    return [questions[i % distinct] for i in range(count)]
+
+
+def start_server(app, port: int):
+    """Run an ASGI app with uvicorn in a background thread and wait until it's up."""
+    import uvicorn
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        if not thread.is_alive():
+            raise RuntimeError(f"Server on port {port} failed to start")
+        time.sleep(0.05)
+    return server
+
+
+def wait_until_ready(base_url: str, timeout: float = 600):
+    """Poll /api/ready until the app has initialized its vector store."""
+    import httpx
+
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        response = httpx.get(f"{base_url}/api/ready")
+        if response.status_code == 200:
+            return
+        if response.json().get("status") == "failed":
+            raise RuntimeError(f"App failed to start: {response.json().get('detail')}")
+        time.sleep(0.1)
+    raise TimeoutError("App did not become ready in time")
+
+
+async def run_load(base_url: str, questions: List[str], concurrency: int) -> List[Tuple[float, bool]]:
+    """POST every question to /api/ask with at most `concurrency` in flight; return (latency, ok) pairs."""
+    import httpx
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, limits=limits, timeout=120) as client:
+        async def ask(question: str) -> Tuple[float, bool]:
+            async with semaphore:
+                start = time.perf_counter()
+                try:
+                    response = await client.post("/api/ask", json={"question": question})
+                    ok = response.status_code == 200
+                except Exception:
+                    ok = False
+                return time.perf_counter() - start, ok
+
+        return await asyncio.gather(*(ask(question) for question in questions))
+
+
+def percentile(values: List[float], p: float) -> float:
+    """Nearest-rank percentile."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    # Round off float noise first (7 / 100 * 100 == 7.000000000000001)
+    rank = max(1, math.ceil(round(p / 100 * len(ordered), 9)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+def stage_breakdown(before: Dict, after: Dict) -> Dict[str, Tuple[int, float]]:
+    """Per-stage (count, mean seconds) recorded between two histogram snapshots."""
+    breakdown = {}
+    for key, series in after.items():
+        previous = before.get(key, {"count": 0, "sum": 0.0})
+        count = series["count"] - previous["count"]
+        if count:
+            breakdown[key[0]] = (count, (series["sum"] - previous["sum"]) / count)
+    return breakdown
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the compliance Q&A API")
+    parser.add_argument("--requests", type=int, default=200, help="Total /api/ask requests")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requests in flight at once")
+    parser.add_argument("--repeat", type=int, default=1, help="Times each distinct question is asked")
+    parser.add_argument("--answer-cache", action="store_true", help="Keep the semantic answer cache enabled")
+    parser.add_argument("--backend", choices=["chroma", "numpy"], default="chroma", help="Vector store backend")
+    parser.add_argument("--embedding-latency-ms", type=float, default=50.0)
+    parser.add_argument("--chat-latency-ms", type=float, default=300.0, help="Mock time to first token")
+    parser.add_argument("--token-latency-ms", type=float, default=10.0, help="Mock time per generated token")
+    parser.add_argument("--mock-rpm", type=int, default=0, help="Mock API quota per endpoint (0 = unlimited)")
+    parser.add_argument("--rate-limits", action="store_true", help="Keep the app's client-side rate limits enabled")
+    parser.add_argument("--mock-port", type=int, default=8100)
+    parser.add_argument("--app-port", type=int, default=8001)
+    args = parser.parse_args()
+
+    # Configure the app before importing it: mock API, throwaway storage
+    workdir = tempfile.mkdtemp(prefix="rag-bench-")
+    os.environ.update({
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{args.mock_port}/v1",
+        "OPENAI_API_KEY": "mock",
+        "CHROMA_PATH": os.path.join(workdir, "chroma_db"),
+        "VECTOR_INDEX_PATH": os.path.join(workdir, "vector_index"),
+        "EMBEDDING_CACHE_PATH": os.path.join(workdir, "embedding_cache.sqlite3"),
+        "VECTOR_BACKEND": args.backend,
+        "STARTUP_SNAPSHOT_PATH": ""
+    })
+    if not args.rate_limits:
+        # Measure the pipeline, not the client-side quota
+        for limit in ("EMBEDDING_RPM_LIMIT", "EMBEDDING_TPM_LIMIT", "CHAT_RPM_LIMIT", "CHAT_TPM_LIMIT"):
+            os.environ[limit] = "0"
+    if not args.answer_cache:
+        os.environ["ANSWER_CACHE_MAX_ENTRIES"] = "0"
+
+    # main.py serves static files relative to the working directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    sys.path.insert(0, os.getcwd())
+
+    import mock_openai
+    mock_openai.configure(args.embedding_latency_ms, args.chat_latency_ms, args.token_latency_ms, args.mock_rpm)
+    start_server(mock_openai.app, args.mock_port)
+
+    import main as app_module
+    from metrics import STAGE_SECONDS
+    print("Starting app (indexing documents against the mock API)...")
+    start_server(app_module.app, args.app_port)
+    wait_until_ready(f"http://127.0.0.1:{args.app_port}")
+
+    questions = build_questions(args.requests, args.repeat)
+    print(f"Running {len(questions)} requests at concurrency {args.concurrency}...")
+
+    before = STAGE_SECONDS.snapshot()
+    started = time.perf_counter()
+    results = asyncio.run(run_load(f"http://127.0.0.1:{args.app_port}", questions, args.concurrency))
+    elapsed = time.perf_counter() - started
+    stages = stage_breakdown(before, STAGE_SECONDS.snapshot())
+
+    latencies = [latency for latency, ok in results if ok]
+    errors = sum(1 for _, ok in results if not ok)
+
+    print("\nResults")
+    print(f"  Requests:    {len(results)} ({errors} errors)")
+    print(f"  Wall time:   {elapsed:.2f}s")
+    print(f"  Throughput:  {len(latencies) / elapsed:.1f} req/s")
+    print(f"  Latency p50: {percentile(latencies, 50) * 1000:.1f} ms")
+    print(f"  Latency p95: {percentile(latencies, 95) * 1000:.1f} ms")
+    print(f"  Latency p99: {percentile(latencies, 99) * 1000:.1f} ms")
+
+    print("\nPer-stage breakdown")
+    print(f"  {'stage':<12} {'calls':>7} {'mean ms':>10}")
+    for stage, (count, mean) in sorted(stages.items()):
+        print(f"  {stage:<12} {count:>7} {mean * 1000:>10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Document Chunking
+
+Splits large compliance documents into retrieval-sized chunks:
+1. Counts tokens with tiktoken (falls back to ~4 chars/token if it's missing)
+2. Packs whole sentences into chunks of at most `max_tokens`
+3. Repeats the last `overlap_tokens` of each chunk at the start of the next
+4. Tags every chunk with its parent document and section
+
+Retrieval hits on chunks are collapsed back to their parent documents
+with collapse_to_parents.
+"""
+
+import itertools
+import re
+from typing import Any, Dict, Iterable, Iterator, List
+
+try:
+    import tiktoken
+    _encoding = tiktoken.get_encoding("cl100k_base")  # tokenizer used by text-embedding-3-*
+except ImportError:
+    _encoding = None
+
+# Whether count_tokens is exact (tiktoken) or an estimate
+EXACT_TOKEN_COUNTS = _encoding is not None
+
+# Sentence ends, or paragraph breaks
+SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?])\s+|\n\s*\n")
+
+
+def count_tokens(text: str) -> int:
+    """Number of tokens in text (exact with tiktoken, estimated otherwise)."""
+    if _encoding is not None:
+        return len(_encoding.encode(text))
+    return max(1, len(text) // 4) if text else 0
+
+
+def split_sentences(text: str) -> List[str]:
+    return [sentence.strip() for sentence in SENTENCE_BOUNDARY.split(text) if sentence.strip()]
+
+
+def _split_long_sentence(sentence: str, max_tokens: int) -> Iterator[str]:
+    """Break a sentence that exceeds max_tokens on word boundaries."""
+    words = sentence.split()
+    piece: List[str] = []
+    for word in words:
+        if piece and count_tokens(" ".join(piece + [word])) > max_tokens:
+            yield " ".join(piece)
+            piece = []
+        piece.append(word)
+    if piece:
+        yield " ".join(piece)
+
+
+def chunk_text(text: str, max_tokens: int = 400, overlap_tokens: int = 50) -> Iterator[str]:
+    """
+    Split text into chunks of at most max_tokens, on sentence boundaries.
+
+    Each chunk starts with the trailing sentences (up to overlap_tokens)
+    of the previous chunk, so context isn't lost at the seams.
+    """
+    sentences = []
+    for sentence in split_sentences(text):
+        if count_tokens(sentence) > max_tokens:
+            sentences.extend(_split_long_sentence(sentence, max_tokens))
+        else:
+            sentences.append(sentence)
+
+    current: List[str] = []
+    current_tokens = 0
+    for sentence in sentences:
+        tokens = count_tokens(sentence)
+        if current and current_tokens + tokens > max_tokens:
+            yield " ".join(current)
+
+            # Carry trailing sentences over as overlap
+            overlap: List[str] = []
+            overlap_count = 0
+            for previous in reversed(current):
+                previous_tokens = count_tokens(previous)
+                if overlap_count + previous_tokens > overlap_tokens or overlap_count + previous_tokens + tokens > max_tokens:
+                    break
+                overlap.insert(0, previous)
+                overlap_count += previous_tokens
+            current, current_tokens = overlap, overlap_count
+
+        current.append(sentence)
+        current_tokens += tokens
+
+    if current:
+        yield " ".join(current)
+
+
+def iter_chunks(
+    documents: Iterable[Dict[str, Any]],
+    max_tokens: int = 400,
+    overlap_tokens: int = 50
+) -> Iterator[Dict[str, Any]]:
+    """
+    Lazily chunk a stream of documents.
+
+    Yields chunk records with the parent's source/section/title, plus
+    `parent_id` and `chunk_index`. Chunk ids are "<parent id>#<index>".
+    A document with no text gets one empty chunk, so it stays in the
+    index (and can still be found by its title).
+    """
+    for doc in documents:
+        contents = chunk_text(doc["content"], max_tokens, overlap_tokens)
+        first = next(contents, None)
+        if first is None:
+            print(f"Warning: Document {doc['id']} has no content, indexing it by its title only")
+            first = ""
+        for index, content in enumerate(itertools.chain([first], contents)):
+            yield {
+                "id": f"{doc['id']}#{index}",
+                "parent_id": doc["id"],
+                "chunk_index": index,
+                "source": doc["source"],
+                "section": doc["section"],
+                "title": doc["title"],
+                "content": content
+            }
+
+
+def collapse_to_parents(
+    hits: List[Dict[str, Any]],
+    top_k: int,
+    max_chunks_per_parent: int = 3
+) -> List[Dict[str, Any]]:
+    """
+    Merge ranked chunk hits into ranked parent documents.
+
+    A parent ranks by its best chunk; its content is its best
+    `max_chunks_per_parent` matched chunks in document order, so prompt
+    size stays bounded no matter how large the source document is.
+    """
+    parents: Dict[str, List[Dict[str, Any]]] = {}
+    for hit in hits:
+        parents.setdefault(hit.get("parent_id", hit["id"]), []).append(hit)
+
+    collapsed = []
+    for parent_id, chunks in list(parents.items())[:top_k]:
+        chunks = chunks[:max_chunks_per_parent]
+        best = chunks[0]
+        in_order = sorted(chunks, key=lambda chunk: chunk.get("chunk_index", 0))
+        collapsed.append({
+            **{key: value for key, value in best.items() if key not in ("parent_id", "chunk_index")},
+            "id": parent_id,
+            "content": "\n...\n".join(chunk["content"] for chunk in in_order),
+            "chunk_ids": [chunk["id"] for chunk in in_order],
+            "relevance_score": max(chunk["relevance_score"] for chunk in chunks)
+        })
+
+    return collapsed
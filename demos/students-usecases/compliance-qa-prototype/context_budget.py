@@ -0,0 +1,157 @@
+"""
+Prompt Context Budgeting
+
+Assembles the compliance context for the generation prompt:
+1. Drops snippets that are near-duplicates of a higher-ranked snippet
+2. Trims each snippet to the sentences most relevant to the question
+3. Enforces an overall token budget, keeping snippets in rank order
+4. Reports how many tokens this saved versus the untrimmed context
+"""
+
+from typing import Any, Dict, List, Set, Tuple
+
+from chunking import EXACT_TOKEN_COUNTS, count_tokens, split_sentences
+from lexical_index import tokenize
+
+# Share of each budget used when token counts are estimated (tiktoken missing):
+# ~4 chars/token undercounts dense text such as numbers and regulation references
+ESTIMATED_BUDGET_SHARE = 0.75
+
+
+def format_snippet(doc: Dict[str, Any], content: str) -> str:
+    """Context block for one document, labelled with its source and section."""
+    return f"[{doc['source']} - {doc['section']}]\n{doc['title']}: {content}"
+
+
+def _shingles(text: str, size: int = 3) -> Set[Tuple[str, ...]]:
+    words = text.lower().split()
+    if len(words) < size:
+        return {tuple(words)}
+    return {tuple(words[i:i + size]) for i in range(len(words) - size + 1)}
+
+
+def _jaccard(a: Set, b: Set) -> float:
+    return len(a & b) / len(a | b) if a and b else 0.0
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Longest prefix of text, cut at a word boundary, that fits in max_tokens."""
+    if count_tokens(text) <= max_tokens:
+        return text
+
+    words = text.split()
+    low, high = 0, len(words)  # words[:low] fits, words[:high + 1] doesn't
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:middle])) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return " ".join(words[:low])
+
+
+def trim_to_relevant(question: str, content: str, max_tokens: int) -> str:
+    """
+    Keep the sentences of content that best match the question terms,
+    up to max_tokens, in their original order.
+
+    A sentence longer than the whole budget is cut at a word boundary, so
+    the result never exceeds max_tokens.
+    """
+    if count_tokens(content) <= max_tokens:
+        return content
+
+    question_terms = set(tokenize(question))
+    sentences = split_sentences(content)
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: len(question_terms & set(tokenize(sentences[i]))),
+        reverse=True
+    )
+
+    kept: List[int] = []
+    used = 0
+    for i in ranked:
+        tokens = count_tokens(sentences[i])
+        if used + tokens > max_tokens:
+            continue
+        kept.append(i)
+        used += tokens
+
+    if not kept:
+        # Even the best sentence is over budget: keep as much of it as fits
+        return truncate_to_tokens(sentences[ranked[0]], max_tokens) if sentences else ""
+
+    # Joining can merge tokens differently at the seams
+    return truncate_to_tokens(" ".join(sentences[i] for i in sorted(kept)), max_tokens)
+
+
+def assemble_context(
+    question: str,
+    relevant_docs: List[Dict[str, Any]],
+    max_tokens: int = 800,
+    snippet_max_tokens: int = 200,
+    duplicate_threshold: float = 0.8
+) -> Tuple[str, Dict[str, int]]:
+    """
+    Build the prompt context for a question within a token budget.
+
+    Both budgets are hard limits and include each snippet's source header
+    and the blank lines between snippets. Without tiktoken, token counts
+    are estimates, so only ESTIMATED_BUDGET_SHARE of each budget is used.
+
+    Args:
+        question: The customer question
+        relevant_docs: Retrieved documents, best first
+        max_tokens: Token budget for the whole context
+        snippet_max_tokens: Token budget for each snippet
+        duplicate_threshold: Word-shingle Jaccard similarity above which a
+            snippet counts as a near-duplicate of a better-ranked one
+
+    Returns:
+        (context, stats) where stats has tokens_before, tokens_after,
+        tokens_saved and snippets_dropped
+    """
+    full_context = "\n\n".join(format_snippet(doc, doc["content"]) for doc in relevant_docs)
+    tokens_before = count_tokens(full_context)
+
+    if not EXACT_TOKEN_COUNTS:
+        max_tokens = int(max_tokens * ESTIMATED_BUDGET_SHARE)
+        snippet_max_tokens = int(snippet_max_tokens * ESTIMATED_BUDGET_SHARE)
+
+    parts: List[str] = []
+    seen: List[Set] = []
+    used = 0
+    dropped = 0
+    for doc in relevant_docs:
+        shingles = _shingles(doc["content"])
+        if any(_jaccard(shingles, other) >= duplicate_threshold for other in seen):
+            dropped += 1
+            continue
+
+        separator_tokens = count_tokens("\n\n") if parts else 0
+        header_tokens = count_tokens(format_snippet(doc, ""))
+        content_budget = min(snippet_max_tokens, max_tokens - used - separator_tokens) - header_tokens
+        if content_budget <= 0:
+            dropped += 1
+            continue
+
+        content = trim_to_relevant(question, doc["content"], content_budget)
+        part = format_snippet(doc, content)
+        seen.append(shingles)
+        parts.append(part)
+        used += separator_tokens + count_tokens(part)
+
+    # Token counts of the pieces needn't add up exactly after joining
+    context = "\n\n".join(parts)
+    while parts and count_tokens(context) > max_tokens:
+        parts.pop()
+        dropped += 1
+        context = "\n\n".join(parts)
+    tokens_after = count_tokens(context)
+    return context, {
+        "tokens_before": tokens_before,
+        "tokens_after": tokens_after,
+        "tokens_saved": max(0, tokens_before - tokens_after),
+        "snippets_dropped": dropped
+    }
@@ -0,0 +1,177 @@
+"""
+Retrieval Evaluation
+
+Measures retrieval quality and speed over a labelled question set
+(data/eval_questions.json, questions mapped to compliance_docs.json ids):
+1. Embeds every question once (through the embedding cache)
+2. Runs retrieval for each configuration: embedding dimensions x vector
+   backend (x quantization, for the NumPy backend) x retrieval mode x re-ranker
+3. Scores recall@k and MRR against the labels, and times each query
+4. Prints a comparison table, so a change can be judged on accuracy,
+   latency and index memory at once
+
+Query embedding time is the same for every configuration and is
+reported once, separately from retrieval latency.
+
+Usage:
+    python evaluate.py
+    python evaluate.py --backends chroma,numpy --modes vector,hybrid --rerankers none,lexical --top-k 5
+    python evaluate.py --backends numpy --quantizations none,int8,binary --dimensions 0,512,256
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import numpy as np
+
+import rag
+
+EVAL_SET_PATH = Path(__file__).parent / "data" / "eval_questions.json"
+
+
+def load_eval_set(path: Path = EVAL_SET_PATH) -> List[Dict[str, Any]]:
+    """Load labelled questions: [{"question": ..., "relevant_ids": [...]}]."""
+    with open(path, "r") as f:
+        return json.load(f)["questions"]
+
+
+def recall_at_k(ranked_ids: List[str], relevant_ids: List[str], k: int) -> float:
+    """Fraction of the relevant documents found in the top k results."""
+    return len(set(ranked_ids[:k]) & set(relevant_ids)) / len(relevant_ids)
+
+
+def reciprocal_rank(ranked_ids: List[str], relevant_ids: List[str]) -> float:
+    """1 / rank of the first relevant result (0 if none was retrieved)."""
+    for rank, doc_id in enumerate(ranked_ids, start=1):
+        if doc_id in relevant_ids:
+            return 1 / rank
+    return 0.0
+
+
+def apply_config(config: Dict[str, Any], top_k: int):
+    """Point the rag module at one configuration."""
+    rag.EMBEDDING_DIMENSIONS = config["dimensions"]
+    rag.VECTOR_BACKEND = config["backend"]
+    rag.VECTOR_QUANTIZATION = config["quantization"]
+    rag._numpy_index = None  # reopen with this configuration's dimensions and quantization
+    rag.RETRIEVAL_MODE = config["mode"]
+    rag.RERANKER = config["reranker"]
+    rag.RERANK_TOP_K = top_k  # rank as many documents as the other configurations
+    rag._reranker_loaded = False
+
+
+def evaluate_config(
+    config: Dict[str, Any],
+    eval_set: List[Dict[str, Any]],
+    embeddings: List[List[float]],
+    top_k: int,
+    ks: List[int]
+) -> Dict[str, Any]:
+    """Retrieve for every question with one configuration and score the results."""
+    apply_config(config, top_k)
+
+    # Warm up (loads the index / re-ranker) outside the timings
+    rag.retrieve_relevant_docs(eval_set[0]["question"], top_k=top_k, query_embedding=embeddings[0])
+
+    latencies = []
+    recalls = {k: [] for k in ks}
+    reciprocal_ranks = []
+    for item, embedding in zip(eval_set, embeddings):
+        start = time.perf_counter()
+        docs = rag.retrieve_relevant_docs(item["question"], top_k=top_k, query_embedding=embedding)
+        latencies.append(time.perf_counter() - start)
+
+        ranked_ids = [doc["id"] for doc in docs]
+        for k in ks:
+            recalls[k].append(recall_at_k(ranked_ids, item["relevant_ids"], k))
+        reciprocal_ranks.append(reciprocal_rank(ranked_ids, item["relevant_ids"]))
+
+    # Memory scanned per query; ChromaDB keeps float32 vectors in its own index
+    collection = rag.get_vector_store()
+    index_kb = collection.memory_bytes() / 1024 if isinstance(collection, rag.NumpyVectorIndex) else None
+
+    return {
+        **config,
+        **{f"recall@{k}": float(np.mean(recalls[k])) for k in ks},
+        "mrr": float(np.mean(reciprocal_ranks)),
+        "p50_ms": float(np.percentile(latencies, 50) * 1000),
+        "p95_ms": float(np.percentile(latencies, 95) * 1000),
+        "index_kb": index_kb
+    }
+
+
+def print_table(rows: List[Dict[str, Any]], ks: List[int]):
+    columns = ["dimensions", "backend", "quantization", "mode", "reranker"]
+    columns += [f"recall@{k}" for k in ks] + ["mrr", "p50_ms", "p95_ms", "index_kb"]
+    widths = [max(len(column), 9) for column in columns]
+    print("  ".join(column.ljust(width) for column, width in zip(columns, widths)))
+    print("  ".join("-" * width for width in widths))
+    for row in rows:
+        cells = [_format_cell(column, row[column]) for column in columns]
+        print("  ".join(cell.ljust(width) for cell, width in zip(cells, widths)))
+
+
+def _format_cell(column: str, value: Any) -> str:
+    if value is None:
+        return "-"
+    if column == "dimensions":
+        return str(value or "full")
+    return f"{value:.3f}" if isinstance(value, float) else str(value)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Evaluate retrieval quality and latency per configuration")
+    parser.add_argument("--backends", default="chroma,numpy", help="Comma-separated vector backends")
+    parser.add_argument("--modes", default="vector,hybrid", help="Comma-separated retrieval modes")
+    parser.add_argument("--rerankers", default="none,lexical", help="Comma-separated re-rankers")
+    parser.add_argument("--quantizations", default="none", help="Comma-separated NumPy backend quantizations")
+    parser.add_argument("--dimensions", default="0", help="Comma-separated embedding sizes (0 = full size)")
+    parser.add_argument("--top-k", type=int, default=5, help="Documents retrieved per question")
+    parser.add_argument("--output", help="Also write the results to this JSON file")
+    args = parser.parse_args()
+
+    backends = args.backends.split(",")
+    ks = sorted({k for k in (1, 3, args.top_k) if k <= args.top_k})
+    eval_set = load_eval_set()
+
+    rows = []
+    for dimensions in [int(value) for value in args.dimensions.split(",")]:
+        rag.EMBEDDING_DIMENSIONS = dimensions
+        rag._numpy_index = None
+
+        # Make sure every backend is indexed (unchanged chunks are skipped)
+        for backend in backends:
+            rag.sync_vector_store(backend)
+
+        start = time.perf_counter()
+        embeddings = rag.get_embeddings([item["question"] for item in eval_set])
+        print(f"Embedded {len(eval_set)} questions in {(time.perf_counter() - start) * 1000:.0f} ms "
+              f"({dimensions or 'full'} dimensions)\n")
+
+        for backend in backends:
+            quantizations = args.quantizations.split(",") if backend == "numpy" else ["none"]
+            for quantization in quantizations:
+                for mode in args.modes.split(","):
+                    for reranker in args.rerankers.split(","):
+                        config = {
+                            "dimensions": dimensions,
+                            "backend": backend,
+                            "quantization": quantization,
+                            "mode": mode,
+                            "reranker": reranker
+                        }
+                        rows.append(evaluate_config(config, eval_set, embeddings, args.top_k, ks))
+
+    print_table(rows, ks)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(rows, f, indent=2)
+        print(f"\nSaved results to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+"""
+Lexical BM25 Index
+
+Keyword search over compliance documents, used alongside vector search:
+1. Tokenizes the id, section, title and content fields, keeping dotted
+   control IDs such as "PR.AA" or "A.9.1" as single tokens
+2. Builds an inverted index (term -> postings) once, up front
+3. Scores queries with BM25 over the postings of the query terms only
+4. Fuses ranked lists with reciprocal rank fusion (RRF)
+"""
+
+import math
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, List, Tuple
+
+# Words, numbers and dotted identifiers (e.g. "pr.aa", "a.9.1")
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:\.[a-z0-9]+)*")
+
+STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "do", "does", "for", "from",
+    "how", "in", "is", "it", "of", "on", "or", "that", "the", "to", "what",
+    "which", "with", "you", "your"
+}
+
+# Matches in short, descriptive fields count for more than matches in content
+FIELD_WEIGHTS = {"id": 2, "section": 2, "title": 2, "content": 1}
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Lowercase and split text into search terms.
+
+    Dotted identifiers are kept whole and also split into their parts,
+    so "PR.AA" matches both "pr.aa" and "aa".
+    """
+    tokens = []
+    for token in TOKEN_PATTERN.findall(text.lower()):
+        if token in STOPWORDS:
+            continue
+        tokens.append(token)
+        if "." in token:
+            tokens.extend(part for part in token.split(".") if part not in STOPWORDS)
+    return tokens
+
+
+class BM25Index:
+    """Inverted index with BM25 scoring over weighted document fields."""
+
+    def __init__(self, documents: List[Dict[str, Any]], k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self.ids: List[str] = []
+        self.postings: Dict[str, List[Tuple[int, float]]] = defaultdict(list)
+        lengths = []
+
+        for position, doc in enumerate(documents):
+            term_counts: Counter = Counter()
+            for field, weight in FIELD_WEIGHTS.items():
+                for token in tokenize(str(doc.get(field, ""))):
+                    term_counts[token] += weight
+
+            self.ids.append(doc["id"])
+            lengths.append(sum(term_counts.values()))
+            for term, tf in term_counts.items():
+                self.postings[term].append((position, tf))
+
+        self.lengths = lengths
+        self.avg_length = sum(lengths) / len(lengths) if lengths else 0.0
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for term, postings in self.postings.items()
+        }
+
+    def search(self, query: str, top_k: int = 20) -> List[Tuple[str, float]]:
+        """Return up to top_k (id, score) pairs, best first. Only documents matching a query term are scored."""
+        scores: Dict[int, float] = defaultdict(float)
+        for term in set(tokenize(query)):
+            idf = self.idf.get(term)
+            if idf is None:
+                continue
+            for position, tf in self.postings[term]:
+                norm = self.k1 * (1 - self.b + self.b * self.lengths[position] / self.avg_length)
+                scores[position] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        ranked = sorted(scores.items(), key=lambda item: item[1], reverse=True)[:top_k]
+        return [(self.ids[position], score) for position, score in ranked]
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse several ranked id lists into one.
+
+    Each id scores sum(1 / (k + rank)) over the lists it appears in, so
+    items ranked well by several retrievers rise to the top.
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] += 1.0 / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
@@ -4,14 +4,33 @@ Compliance Q&A API
 FastAPI backend that serves the RAG-powered compliance response generator.
 """
 
+import asyncio
+import json
+import math
+import os
+import time
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse, PlainTextResponse, StreamingResponse
+from openai import RateLimitError
 from pydantic import BaseModel
 from typing import List
 
-from rag import initialize_vector_store, ask_compliance_question
+from rag import (
+    initialize_vector_store,
+    ask_compliance_question_async,
+    stream_compliance_answer,
+    answer_questionnaire_async,
+)
+from metrics import REQUEST_SECONDS, render_prometheus, server_timing_header, start_request_timings
+from transport import retry_after_seconds
+
+# Largest questionnaire accepted by /api/ask/batch
+MAX_QUESTIONNAIRE_SIZE = 1000
+
+# Add a Server-Timing header with per-stage durations to API responses
+SERVER_TIMING = os.getenv("SERVER_TIMING", "0") == "1"
 
 
 # Request/Response Models
@@ -26,6 +45,20 @@ class QuestionRequest(BaseModel):
         }
 
 
+class QuestionnaireRequest(BaseModel):
+    questions: List[str]
+
+    class Config:
+        json_schema_extra = {
+            "example": {
+                "questions": [
+                    "How do you protect administrative access?",
+                    "How is data encrypted at rest?"
+                ]
+            }
+        }
+
+
 class SnippetResponse(BaseModel):
     source: str
     section: str
@@ -39,18 +72,45 @@ class AnswerResponse(BaseModel):
     response: str
     sources: List[str]
     relevant_snippets: List[SnippetResponse]
+    cached: bool = False
+    context_tokens_saved: int = 0
+
+
+# Readiness: the vector store is initialized in the background after startup
+startup_state = {"ready": False, "error": None}
+
+
+async def initialize_in_background():
+    try:
+        await asyncio.to_thread(initialize_vector_store)
+        startup_state["ready"] = True
+        print("Vector store ready!")
+    except Exception as e:
+        startup_state["error"] = str(e)
+        print(f"Vector store initialization failed: {e}")
+
+
+def require_ready():
+    """Reject pipeline requests until the vector store is initialized."""
+    if not startup_state["ready"]:
+        raise HTTPException(
+            status_code=503,
+            detail="Service is starting up, retry shortly",
+            headers={"Retry-After": "1"}
+        )
 
 
 # Lifespan context manager for startup/shutdown
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    # Startup: Initialize vector store
-    print("Starting up - initializing vector store...")
-    initialize_vector_store()
-    print("Vector store ready!")
+    # Startup: initialize the vector store without delaying the server;
+    # /api/ready reports when it's done
+    print("Starting up - initializing vector store in the background...")
+    init_task = asyncio.create_task(initialize_in_background())
     yield
     # Shutdown: cleanup if needed
     print("Shutting down...")
+    init_task.cancel()
 
 
 # Create FastAPI app
@@ -62,6 +122,29 @@ app = FastAPI(
 )
 
 
+@app.middleware("http")
+async def record_request_timings(request: Request, call_next):
+    """
+    Time API requests and collect per-stage timings for them.
+
+    For streaming endpoints, the timings (and Server-Timing header) cover
+    the work done before the first byte is sent.
+    """
+    if not request.url.path.startswith("/api/"):
+        return await call_next(request)
+
+    start = time.perf_counter()
+    timings = start_request_timings()
+    response = await call_next(request)
+    # Label by route template, not raw URL, so unknown paths can't add series
+    route = request.scope.get("route")
+    REQUEST_SECONDS.observe(time.perf_counter() - start, path=route.path if route else "unmatched")
+
+    if SERVER_TIMING and timings:
+        response.headers["Server-Timing"] = server_timing_header(timings)
+    return response
+
+
 # API Routes
 @app.post("/api/ask", response_model=AnswerResponse)
 async def ask_question(request: QuestionRequest):
@@ -72,23 +155,109 @@ async def ask_question(request: QuestionRequest):
     1. Retrieves relevant compliance framework snippets (NIST CSF 2.0, ISO 27001)
     2. Uses GPT to generate a professional vendor response
     3. Returns the response with source attribution
+
+    The whole pipeline is async, so a slow generation never blocks
+    other requests on the same worker.
     """
     if not request.question.strip():
         raise HTTPException(status_code=400, detail="Question cannot be empty")
+    require_ready()
 
     try:
-        result = ask_compliance_question(request.question)
+        result = await ask_compliance_question_async(request.question)
         return AnswerResponse(**result)
+    except RateLimitError as e:
+        # Still rate limited after retries: tell the client when to come back
+        raise HTTPException(
+            status_code=429,
+            detail="OpenAI rate limit reached, retry later",
+            headers={"Retry-After": str(math.ceil(retry_after_seconds(e) or 1))}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error processing question: {str(e)}")
 
 
+@app.post("/api/ask/stream")
+async def ask_question_stream(request: QuestionRequest):
+    """
+    Streaming version of /api/ask using Server-Sent Events.
+
+    Sends a `snippets` event as soon as retrieval finishes, then one
+    `token` event per generated chunk and a final `done` event.
+    Failures after the stream has started are reported as an `error` event.
+    """
+    if not request.question.strip():
+        raise HTTPException(status_code=400, detail="Question cannot be empty")
+    require_ready()
+
+    async def event_stream():
+        try:
+            async for event in stream_compliance_answer(request.question):
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+        except Exception as e:
+            error = {"type": "error", "detail": f"Error processing question: {str(e)}"}
+            yield f"event: error\ndata: {json.dumps(error)}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@app.post("/api/ask/batch")
+async def ask_questionnaire(request: QuestionnaireRequest):
+    """
+    Answer a whole security questionnaire in one call.
+
+    Questions are embedded in batches, retrieved with one multi-query
+    lookup and generated in parallel. Answers stream back as JSON lines
+    (one object per question, in completion order) with an `index` field
+    pointing at the question's position in the request.
+    """
+    if not request.questions:
+        raise HTTPException(status_code=400, detail="Questionnaire cannot be empty")
+    if len(request.questions) > MAX_QUESTIONNAIRE_SIZE:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Questionnaire has {len(request.questions)} questions (max {MAX_QUESTIONNAIRE_SIZE})"
+        )
+    if any(not q.strip() for q in request.questions):
+        raise HTTPException(status_code=400, detail="Questions cannot be empty")
+    require_ready()
+
+    async def answer_lines():
+        try:
+            async for answer in answer_questionnaire_async(request.questions):
+                yield json.dumps(answer) + "\n"
+        except Exception as e:
+            yield json.dumps({"error": f"Error processing questionnaire: {str(e)}"}) + "\n"
+
+    return StreamingResponse(answer_lines(), media_type="application/x-ndjson")
+
+
+@app.get("/api/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Pipeline latency histograms, token counts and cache hit rates in Prometheus format."""
+    return PlainTextResponse(render_prometheus(), media_type="text/plain; version=0.0.4")
+
+
 @app.get("/api/health")
 async def health_check():
-    """Health check endpoint."""
+    """Liveness check: the process is up and serving HTTP."""
     return {"status": "healthy", "service": "compliance-qa"}
 
 
+@app.get("/api/ready")
+async def readiness_check():
+    """Readiness check: 200 once the vector store is initialized, 503 until then."""
+    if startup_state["ready"]:
+        return {"status": "ready", "service": "compliance-qa"}
+    if startup_state["error"]:
+        return JSONResponse(status_code=503, content={"status": "failed", "detail": startup_state["error"]})
+    return JSONResponse(status_code=503, content={"status": "starting"})
+
+
 # Serve static files (HTML frontend)
 app.mount("/static", StaticFiles(directory="static"), name="static")
 
@@ -100,6 +269,7 @@ async def root():
 
 
 # Run with: uvicorn main:app --reload
+# Multiple workers sharing one read-only index: python serve.py --workers 4
 if __name__ == "__main__":
     import uvicorn
     uvicorn.run(app, host="0.0.0.0", port=8000)
@@ -0,0 +1,204 @@
+"""
+Pipeline Metrics
+
+Minimal Prometheus-style instrumentation for the RAG pipeline:
+1. Histograms and counters with labels, rendered in the Prometheus text format
+2. Gauges backed by callbacks (e.g. cache hit rates)
+3. timed(stage) spans that feed a stage-latency histogram and, during a
+   request, a per-request timing breakdown (for the Server-Timing header)
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow generations
+DEFAULT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+_registry: List["_Metric"] = []
+_request_timings: ContextVar[Optional[Dict[str, float]]] = ContextVar("request_timings", default=None)
+
+
+def _escape_label_value(value: str) -> str:
+    """Escape a label value for the text exposition format."""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Tuple[str, ...], values: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape_label_value(value)}"' for name, value in zip(label_names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self._lock = threading.Lock()
+        _registry.append(self)
+
+    def _header(self) -> List[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...] = ()):
+        super().__init__(name, help_text, label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        if not label_names:
+            # An unlabeled counter reports 0 from the start, so rate() works on a fresh worker
+            self._values[()] = 0
+
+    def inc(self, amount: float = 1, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = dict(self._values)
+        return self._header() + [
+            f"{self.name}{_format_labels(self.label_names, key)} {_format_value(value)}"
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help_text: str,
+        label_names: Tuple[str, ...] = (),
+        buckets: Tuple[float, ...] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, help_text, label_names)
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], Dict[str, object]] = {}
+        if not label_names:
+            self._series[()] = {"buckets": [0] * len(buckets), "sum": 0.0, "count": 0}
+
+    def observe(self, value: float, **labels: str):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            series = self._series.setdefault(key, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    def snapshot(self) -> Dict[Tuple[str, ...], Dict[str, object]]:
+        """Copy of the raw series: {label values: {"buckets", "sum", "count"}}."""
+        with self._lock:
+            return {key: {**series, "buckets": list(series["buckets"])} for key, series in self._series.items()}
+
+    def render(self) -> List[str]:
+        lines = self._header()
+        for key, series in sorted(self.snapshot().items()):
+            for bound, count in zip(self.buckets, series["buckets"]):
+                labels = _format_labels(self.label_names, key, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{labels} {count}")
+            labels = _format_labels(self.label_names, key, 'le="+Inf"')
+            lines.append(f"{self.name}_bucket{labels} {series['count']}")
+            lines.append(f"{self.name}_sum{_format_labels(self.label_names, key)} {_format_value(series['sum'])}")
+            lines.append(f"{self.name}_count{_format_labels(self.label_names, key)} {series['count']}")
+        return lines
+
+
+class Gauge(_Metric):
+    """Gauge whose value is read from a callback at render time."""
+    kind = "gauge"
+
+    def __init__(self, name: str, help_text: str, read: Callable[[], float]):
+        super().__init__(name, help_text)
+        self.read = read
+
+    def render(self) -> List[str]:
+        return self._header() + [f"{self.name} {_format_value(self.read())}"]
+
+
+def render_prometheus() -> str:
+    """All registered metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in _registry:
+        lines.extend(metric.render())
+    return "\n".join(lines) + "\n"
+
+
+# Pipeline metrics
+STAGE_SECONDS = Histogram(
+    "rag_stage_duration_seconds",
+    "Time spent in each RAG pipeline stage",
+    label_names=("stage",)
+)
+REQUEST_SECONDS = Histogram(
+    "rag_http_request_duration_seconds",
+    "End-to-end HTTP request latency",
+    label_names=("path",)
+)
+TOKENS = Counter(
+    "rag_tokens_total",
+    "OpenAI tokens used, by kind (embedding, prompt, completion)",
+    label_names=("kind",)
+)
+CONTEXT_TOKENS_SAVED = Counter(
+    "rag_context_tokens_saved_total",
+    "Prompt tokens removed by the context budgeter"
+)
+COALESCED_REQUESTS = Counter(
+    "rag_coalesced_requests_total",
+    "Questions answered by sharing an identical in-flight request"
+)
+
+
+def record_stage(stage: str, seconds: float):
+    """Record a stage duration in the histogram and the current request's timings."""
+    STAGE_SECONDS.observe(seconds, stage=stage)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings[stage] = timings.get(stage, 0.0) + seconds
+
+
+@contextmanager
+def timed(stage: str) -> Iterator[None]:
+    """Time a pipeline stage (see record_stage)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(stage, time.perf_counter() - start)
+
+
+def start_request_timings() -> Dict[str, float]:
+    """Start collecting stage timings for the current request (context)."""
+    timings: Dict[str, float] = {}
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: Dict[str, float]) -> str:
+    """Format stage timings as a Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.1f}" for stage, seconds in timings.items())
+
+
+def record_usage(kind: str, tokens: Optional[int]):
+    """Count OpenAI token usage, ignoring responses without usage data."""
+    if tokens:
+        TOKENS.inc(tokens, kind=kind)
@@ -0,0 +1,198 @@
+"""
+Mock OpenAI Server
+
+Local stand-in for the OpenAI embeddings and chat completions endpoints,
+used for offline benchmarking:
+1. Deterministic embeddings: hashed bag-of-words vectors, so texts sharing
+   words are similar, and the same text always gets the same vector
+2. Canned chat completions, with or without streaming
+3. Configurable artificial latency for every call
+4. An optional requests-per-minute quota, answered with 429 + Retry-After
+
+Usage:
+    python mock_openai.py --port 8100 --chat-latency-ms 800
+
+Point the app at it with:
+    OPENAI_BASE_URL=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import re
+import time
+from collections import deque
+from functools import lru_cache
+from typing import List
+
+import numpy as np
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+EMBEDDING_DIMENSIONS = 1536
+
+CANNED_RESPONSE = (
+    "Our product enforces access control in line with NIST CSF 2.0 PR.AA and "
+    "ISO 27001 Annex A controls. Administrative access requires multi-factor "
+    "authentication, permissions follow least privilege through role-based "
+    "access control, and all privileged activity is logged and reviewed."
+)
+
+# Artificial latency settings (milliseconds), adjustable via configure()
+latency = {
+    "embedding_ms": 50.0,
+    "chat_first_token_ms": 300.0,
+    "chat_token_ms": 10.0
+}
+
+# Requests-per-minute quota per endpoint (0 = unlimited), adjustable via configure()
+quota = {"rpm": 0}
+_recent_requests = {"embeddings": deque(), "chat": deque()}
+
+app = FastAPI(title="Mock OpenAI API")
+
+
+def configure(embedding_ms: float, chat_first_token_ms: float, chat_token_ms: float, rpm: int = 0):
+    latency["embedding_ms"] = embedding_ms
+    latency["chat_first_token_ms"] = chat_first_token_ms
+    latency["chat_token_ms"] = chat_token_ms
+    quota["rpm"] = rpm
+
+
+def _over_quota(endpoint: str) -> JSONResponse | None:
+    """429 response if the endpoint is over its sliding one-minute quota."""
+    if not quota["rpm"]:
+        return None
+    now = time.monotonic()
+    recent = _recent_requests[endpoint]
+    while recent and recent[0] <= now - 60:
+        recent.popleft()
+    if len(recent) >= quota["rpm"]:
+        retry_after_ms = int((recent[0] + 60 - now) * 1000) + 1
+        return JSONResponse(
+            status_code=429,
+            content={"error": {"message": "Rate limit reached", "type": "requests", "code": "rate_limit_exceeded"}},
+            headers={"retry-after-ms": str(retry_after_ms)}
+        )
+    recent.append(now)
+    return None
+
+
+@lru_cache(maxsize=50_000)
+def _word_vector(word: str) -> np.ndarray:
+    seed = int.from_bytes(hashlib.sha256(word.encode("utf-8")).digest()[:8], "little")
+    return np.random.default_rng(seed).standard_normal(EMBEDDING_DIMENSIONS).astype(np.float32)
+
+
+def embed(text: str, dimensions: int = EMBEDDING_DIMENSIONS) -> List[float]:
+    """Deterministic unit vector: sum of per-word random vectors."""
+    words = re.findall(r"[a-z0-9]+", text.lower()) or [""]
+    vector = np.sum([_word_vector(word) for word in words], axis=0)[:dimensions]
+    return (vector / (np.linalg.norm(vector) or 1)).tolist()
+
+
+def _count_tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+@app.post("/v1/embeddings")
+async def embeddings(request: Request):
+    if (limited := _over_quota("embeddings")) is not None:
+        return limited
+    body = await request.json()
+    inputs = body["input"] if isinstance(body["input"], list) else [body["input"]]
+    dimensions = body.get("dimensions") or EMBEDDING_DIMENSIONS
+
+    await asyncio.sleep(latency["embedding_ms"] / 1000)
+    tokens = sum(_count_tokens(text) for text in inputs)
+    return {
+        "object": "list",
+        "model": body.get("model", "mock-embedding"),
+        "data": [
+            {"object": "embedding", "index": i, "embedding": embed(text, dimensions)}
+            for i, text in enumerate(inputs)
+        ],
+        "usage": {"prompt_tokens": tokens, "total_tokens": tokens}
+    }
+
+
+@app.post("/v1/chat/completions")
+async def chat_completions(request: Request):
+    if (limited := _over_quota("chat")) is not None:
+        return limited
+    body = await request.json()
+    model = body.get("model", "mock-chat")
+    prompt_tokens = sum(_count_tokens(message["content"]) for message in body["messages"])
+    words = CANNED_RESPONSE.split(" ")
+    usage = {
+        "prompt_tokens": prompt_tokens,
+        "completion_tokens": len(words),
+        "total_tokens": prompt_tokens + len(words)
+    }
+    created = int(time.time())
+
+    if not body.get("stream"):
+        await asyncio.sleep((latency["chat_first_token_ms"] + latency["chat_token_ms"] * len(words)) / 1000)
+        return {
+            "id": "chatcmpl-mock",
+            "object": "chat.completion",
+            "created": created,
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": CANNED_RESPONSE},
+                "finish_reason": "stop"
+            }],
+            "usage": usage
+        }
+
+    include_usage = (body.get("stream_options") or {}).get("include_usage", False)
+
+    async def chunks():
+        await asyncio.sleep(latency["chat_first_token_ms"] / 1000)
+        for i, word in enumerate(words):
+            if i:
+                await asyncio.sleep(latency["chat_token_ms"] / 1000)
+            chunk = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [{
+                    "index": 0,
+                    "delta": {"content": word if i == 0 else " " + word},
+                    "finish_reason": "stop" if i == len(words) - 1 else None
+                }]
+            }
+            yield f"data: {json.dumps(chunk)}\n\n"
+        if include_usage:
+            final = {
+                "id": "chatcmpl-mock",
+                "object": "chat.completion.chunk",
+                "created": created,
+                "model": model,
+                "choices": [],
+                "usage": usage
+            }
+            yield f"data: {json.dumps(final)}\n\n"
+        yield "data: [DONE]\n\n"
+
+    return StreamingResponse(chunks(), media_type="text/event-stream")
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Mock OpenAI embeddings and chat completions server")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--embedding-latency-ms", type=float, default=latency["embedding_ms"])
+    parser.add_argument("--chat-latency-ms", type=float, default=latency["chat_first_token_ms"],
+                        help="Delay before the first generated token")
+    parser.add_argument("--token-latency-ms", type=float, default=latency["chat_token_ms"],
+                        help="Delay between generated tokens")
+    parser.add_argument("--rpm", type=int, default=0, help="Requests per minute per endpoint before 429s (0 = unlimited)")
+    args = parser.parse_args()
+
+    configure(args.embedding_latency_ms, args.chat_latency_ms, args.token_latency_ms, args.rpm)
+    uvicorn.run(app, host="127.0.0.1", port=args.port)
@@ -3,28 +3,220 @@ RAG Pipeline for Compliance Q&A
 
 This module handles:
 1. Loading compliance documents
-2. Creating embeddings with OpenAI
-3. Storing/retrieving from ChromaDB
+2. Creating embeddings with OpenAI (cached on disk)
+3. Storing/retrieving from ChromaDB (or a local NumPy index, see VECTOR_BACKEND)
 4. Generating responses with GPT
+5. Serving repeat questions from a semantic answer cache
+6. Starting from a precomputed snapshot of the index (see snapshot.py)
+
+Every stage has an async twin (suffix `_async`) for the FastAPI request
+path: OpenAI calls go through AsyncOpenAI and blocking vector store/SQLite
+work is offloaded to a thread, so the event loop is never blocked.
 """
 
+import asyncio
+import hashlib
 import json
 import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, AsyncIterator, Iterable, Iterator, Tuple
+
+import numpy as np
+from openai import OpenAI, AsyncOpenAI
 
-import chromadb
-from openai import OpenAI
+from answer_cache import SemanticAnswerCache
+from chunking import collapse_to_parents, count_tokens, iter_chunks
+from context_budget import assemble_context
+from embedding_cache import EmbeddingCache
+from lexical_index import BM25Index, reciprocal_rank_fusion
+from metrics import CONTEXT_TOKENS_SAVED, COALESCED_REQUESTS, Gauge, record_stage, record_usage, timed
+from rerank import load_reranker, rerank
+from single_flight import AsyncSingleFlight, SingleFlight
+from transport import (
+    RateLimiter,
+    call_with_retry,
+    call_with_retry_async,
+    pooled_async_http_client,
+    pooled_http_client,
+)
+from snapshot import read_snapshot, write_snapshot
+from vector_index import NumpyVectorIndex
 
-# Initialize OpenAI client
-client = OpenAI()
+# OpenAI clients (sync for scripts/ingestion, async for the API), the
+# ChromaDB client and the embedding cache are created on first use, so
+# importing this module is cheap and touches no files
+_client: OpenAI | None = None
+_async_client: AsyncOpenAI | None = None
+_chroma_client = None
+_embedding_cache: EmbeddingCache | None = None
+_embedding_cache_lock = threading.Lock()
 
-# Initialize ChromaDB (persistent storage in ./chroma_db)
-chroma_client = chromadb.PersistentClient(path="./chroma_db")
+# ChromaDB persistent storage (./chroma_db by default)
+CHROMA_PATH = os.getenv("CHROMA_PATH", "./chroma_db")
 
 # Collection name for our compliance documents
 COLLECTION_NAME = "compliance_docs"
 
+# Retrieval backend: "chroma" (default) or "numpy" (in-process memory-mapped index)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+VECTOR_INDEX_PATH = os.getenv("VECTOR_INDEX_PATH", "./vector_index")
+# NumPy backend only: scan int8 (4x smaller) or binary (32x smaller) codes, then
+# re-score RESCORE_MULTIPLIER x n_results candidates with the float vectors
+VECTOR_QUANTIZATION = os.getenv("VECTOR_QUANTIZATION", "none")  # "none", "int8" or "binary"
+RESCORE_MULTIPLIER = int(os.getenv("RESCORE_MULTIPLIER", "10"))
+_numpy_index: NumpyVectorIndex | None = None
+
+# Precomputed startup snapshot (see snapshot.py), used instead of syncing when it's up to date
+STARTUP_SNAPSHOT_PATH = os.getenv("STARTUP_SNAPSHOT_PATH", "./startup_snapshot.bin")
+
+# Retrieval mode: "hybrid" (vector + BM25 keyword search, fused with RRF) or "vector"
+RETRIEVAL_MODE = os.getenv("RETRIEVAL_MODE", "hybrid")
+HYBRID_CANDIDATES = int(os.getenv("HYBRID_CANDIDATES", "20"))  # candidates per retriever before fusion
+RRF_K = int(os.getenv("RRF_K", "60"))
+_lexical_index: BM25Index | None = None
+
+# Re-ranking: over-fetch RERANK_CANDIDATES documents, re-score them and keep the best RERANK_TOP_K
+RERANKER = os.getenv("RERANKER", "lexical")  # "lexical", "cross-encoder" or "none"
+RERANK_MODEL = os.getenv("RERANK_MODEL", "cross-encoder/ms-marco-MiniLM-L-6-v2")
+RERANK_CANDIDATES = int(os.getenv("RERANK_CANDIDATES", "20"))
+RERANK_TOP_K = int(os.getenv("RERANK_TOP_K", "3"))
+RERANK_BUDGET_MS = float(os.getenv("RERANK_BUDGET_MS", "150"))  # past this, keep the vector ordering
+RERANK_BATCH_SIZE = int(os.getenv("RERANK_BATCH_SIZE", "8"))
+_reranker = None
+_reranker_loaded = False
+
+# Chunking: documents are split into chunks of at most CHUNK_MAX_TOKENS before embedding
+CHUNK_MAX_TOKENS = int(os.getenv("CHUNK_MAX_TOKENS", "400"))
+CHUNK_OVERLAP_TOKENS = int(os.getenv("CHUNK_OVERLAP_TOKENS", "50"))
+CHUNKS_PER_RESULT = 3  # chunk candidates fetched per requested parent document
+
+# Prompt context budget: near-duplicate snippets are dropped and the rest trimmed to fit
+CONTEXT_TOKEN_BUDGET = int(os.getenv("CONTEXT_TOKEN_BUDGET", "1200"))
+SNIPPET_TOKEN_BUDGET = int(os.getenv("SNIPPET_TOKEN_BUDGET", "300"))
+DUPLICATE_SNIPPET_THRESHOLD = float(os.getenv("DUPLICATE_SNIPPET_THRESHOLD", "0.8"))
+
+# Model settings
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_DIMENSIONS = int(os.getenv("EMBEDDING_DIMENSIONS", "0"))  # shortened embeddings, e.g. 512; 0 = full size
+CHAT_MODEL = "gpt-4o-mini"
+CHAT_MAX_TOKENS = 1000
+
+# OpenAI transport: pooled keep-alive connections, shared retry policy
+OPENAI_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "100"))
+OPENAI_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "20"))
+OPENAI_TIMEOUT_SECONDS = float(os.getenv("OPENAI_TIMEOUT_SECONDS", "60"))
+OPENAI_MAX_RETRIES = int(os.getenv("OPENAI_MAX_RETRIES", "5"))              # retries per failed call
+OPENAI_BACKOFF_SECONDS = float(os.getenv("OPENAI_BACKOFF_SECONDS", "1.0"))  # initial (jittered) retry delay
+
+# Per-model rate limits, per minute (defaults are OpenAI's tier 1 limits; 0 disables a limit)
+embedding_rate_limiter = RateLimiter(
+    requests_per_minute=float(os.getenv("EMBEDDING_RPM_LIMIT", "3000")),
+    tokens_per_minute=float(os.getenv("EMBEDDING_TPM_LIMIT", "1000000"))
+)
+chat_rate_limiter = RateLimiter(
+    requests_per_minute=float(os.getenv("CHAT_RPM_LIMIT", "500")),
+    tokens_per_minute=float(os.getenv("CHAT_TPM_LIMIT", "200000"))
+)
+
+# Batched ingestion settings (override via environment variables)
+EMBED_BATCH_SIZE = int(os.getenv("EMBED_BATCH_SIZE", "100"))       # texts per embeddings call
+EMBED_MAX_WORKERS = int(os.getenv("EMBED_MAX_WORKERS", "4"))       # concurrent embeddings calls
+
+# Persistent embedding cache shared by ingestion and queries
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "./embedding_cache.sqlite3")
+EMBEDDING_CACHE_MAX_ENTRIES = int(os.getenv("EMBEDDING_CACHE_MAX_ENTRIES", "100000"))
+
+# Semantic answer cache in front of the RAG pipeline
+ANSWER_CACHE_THRESHOLD = float(os.getenv("ANSWER_CACHE_THRESHOLD", "0.95"))  # min cosine similarity
+ANSWER_CACHE_TTL_SECONDS = float(os.getenv("ANSWER_CACHE_TTL_SECONDS", "3600"))
+ANSWER_CACHE_MAX_ENTRIES = int(os.getenv("ANSWER_CACHE_MAX_ENTRIES", "1000"))
+answer_cache = SemanticAnswerCache(
+    threshold=ANSWER_CACHE_THRESHOLD,
+    ttl_seconds=ANSWER_CACHE_TTL_SECONDS,
+    max_entries=ANSWER_CACHE_MAX_ENTRIES
+)
+
+# Cache hit rates, exposed with the other pipeline metrics
+Gauge("rag_embedding_cache_hit_rate", "Embedding cache hit rate", lambda: get_embedding_cache().stats()["hit_rate"])
+Gauge("rag_embedding_cache_entries", "Embeddings stored in the cache", lambda: get_embedding_cache().stats()["entries"])
+Gauge("rag_answer_cache_hit_rate", "Semantic answer cache hit rate", lambda: answer_cache.stats()["hit_rate"])
+Gauge("rag_answer_cache_entries", "Answers stored in the semantic cache", lambda: answer_cache.stats()["entries"])
+
+# Concurrent identical questions share one pipeline run
+_in_flight = SingleFlight()
+_in_flight_async = AsyncSingleFlight()
+
+# Bulk questionnaire answering: maximum concurrent generations
+QUESTIONNAIRE_CONCURRENCY = int(os.getenv("QUESTIONNAIRE_CONCURRENCY", "8"))
+
+
+def get_client() -> OpenAI:
+    """Sync OpenAI client, created on first use."""
+    global _client
+    if _client is None:
+        _client = OpenAI(
+            max_retries=0,  # retries go through transport.call_with_retry
+            http_client=pooled_http_client(OPENAI_MAX_CONNECTIONS, OPENAI_MAX_KEEPALIVE, timeout=OPENAI_TIMEOUT_SECONDS)
+        )
+    return _client
+
+
+def get_async_client() -> AsyncOpenAI:
+    """Async OpenAI client, created on first use."""
+    global _async_client
+    if _async_client is None:
+        _async_client = AsyncOpenAI(
+            max_retries=0,
+            http_client=pooled_async_http_client(
+                OPENAI_MAX_CONNECTIONS, OPENAI_MAX_KEEPALIVE, timeout=OPENAI_TIMEOUT_SECONDS
+            )
+        )
+    return _async_client
+
+
+def get_chroma_client():
+    """ChromaDB client, created (and chromadb imported) on first use."""
+    global _chroma_client
+    if _chroma_client is None:
+        import chromadb
+        _chroma_client = chromadb.PersistentClient(path=CHROMA_PATH)
+    return _chroma_client
+
+
+def get_embedding_cache() -> EmbeddingCache:
+    """On-disk embedding cache, opened (or created) on first use."""
+    global _embedding_cache
+    if _embedding_cache is None:
+        # Several threads may ask at once (startup sync and API requests)
+        with _embedding_cache_lock:
+            if _embedding_cache is None:
+                _embedding_cache = EmbeddingCache(EMBEDDING_CACHE_PATH, max_entries=EMBEDDING_CACHE_MAX_ENTRIES)
+    return _embedding_cache
+
+
+def embedding_space() -> str:
+    """
+    Name of the embedding space: the model, plus the dimensions if shortened.
+
+    Vectors from different spaces aren't comparable, so this keys the
+    embedding cache and names the vector store.
+    """
+    if EMBEDDING_DIMENSIONS:
+        return f"{EMBEDDING_MODEL}@{EMBEDDING_DIMENSIONS}"
+    return EMBEDDING_MODEL
+
+
+def _embedding_request(texts: List[str]) -> Dict[str, Any]:
+    """Arguments for an embeddings.create call."""
+    request = {"model": EMBEDDING_MODEL, "input": texts}
+    if EMBEDDING_DIMENSIONS:
+        request["dimensions"] = EMBEDDING_DIMENSIONS
+    return request
+
 
 def load_documents() -> List[Dict[str, Any]]:
     """Load compliance documents from JSON file."""
@@ -34,126 +226,540 @@ def load_documents() -> List[Dict[str, Any]]:
     return data["documents"]
 
 
+def corpus_fingerprint(documents: List[Dict[str, Any]]) -> str:
+    """Stable hash of the document corpus, used to invalidate cached answers."""
+    payload = json.dumps(documents, sort_keys=True).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def _request_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Request embedding vectors for many texts in a single OpenAI call.
+
+    Waits for the embedding rate limits and retries rate limits and
+    transient errors with jittered backoff (see transport.py).
+    Returned vectors are in the same order as the input texts.
+    """
+    response = call_with_retry(
+        lambda: get_client().embeddings.create(**_embedding_request(texts)),
+        embedding_rate_limiter,
+        tokens=sum(count_tokens(text) for text in texts),
+        max_retries=OPENAI_MAX_RETRIES,
+        base_seconds=OPENAI_BACKOFF_SECONDS
+    )
+
+    record_usage("embedding", response.usage.prompt_tokens)
+
+    # The API tags each vector with its input index; don't rely on ordering
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+async def _request_embeddings_async(texts: List[str]) -> List[List[float]]:
+    """Async version of _request_embeddings."""
+    response = await call_with_retry_async(
+        lambda: get_async_client().embeddings.create(**_embedding_request(texts)),
+        embedding_rate_limiter,
+        tokens=sum(count_tokens(text) for text in texts),
+        max_retries=OPENAI_MAX_RETRIES,
+        base_seconds=OPENAI_BACKOFF_SECONDS
+    )
+
+    record_usage("embedding", response.usage.prompt_tokens)
+    return [item.embedding for item in sorted(response.data, key=lambda d: d.index)]
+
+
+def _missing_texts(texts: List[str], embeddings: List[List[float] | None]) -> List[str]:
+    """Unique texts that had no cached embedding."""
+    return list(dict.fromkeys(
+        text for text, embedding in zip(texts, embeddings) if embedding is None
+    ))
+
+
+def _fill_missing(
+    texts: List[str],
+    embeddings: List[List[float] | None],
+    fresh: Dict[str, List[float]]
+) -> List[List[float]]:
+    """Combine cached embeddings with freshly requested ones."""
+    return [
+        embedding if embedding is not None else fresh[text]
+        for text, embedding in zip(texts, embeddings)
+    ]
+
+
+def get_embeddings(texts: List[str]) -> List[List[float]]:
+    """
+    Get embedding vectors for many texts, using the on-disk cache.
+
+    Only texts missing from the cache are sent to OpenAI (in one call),
+    and their vectors are stored for next time.
+    """
+    embeddings = get_embedding_cache().get_many(embedding_space(), texts)
+
+    missing = _missing_texts(texts, embeddings)
+    if missing:
+        fresh = dict(zip(missing, _request_embeddings(missing)))
+        get_embedding_cache().put_many(embedding_space(), missing, list(fresh.values()))
+        embeddings = _fill_missing(texts, embeddings, fresh)
+
+    return embeddings
+
+
+async def get_embeddings_async(texts: List[str]) -> List[List[float]]:
+    """Async version of get_embeddings (cache I/O runs in a worker thread)."""
+    embeddings = await asyncio.to_thread(get_embedding_cache().get_many, embedding_space(), texts)
+
+    missing = _missing_texts(texts, embeddings)
+    if missing:
+        fresh = dict(zip(missing, await _request_embeddings_async(missing)))
+        await asyncio.to_thread(get_embedding_cache().put_many, embedding_space(), missing, list(fresh.values()))
+        embeddings = _fill_missing(texts, embeddings, fresh)
+
+    return embeddings
+
+
 def get_embedding(text: str) -> List[float]:
     """Get embedding vector for a text using OpenAI."""
-    response = client.embeddings.create(
-        model="text-embedding-3-small",
-        input=text
-    )
-    return response.data[0].embedding
+    with timed("embed"):
+        return get_embeddings([text])[0]
 
 
-def initialize_vector_store():
+async def get_embedding_async(text: str) -> List[float]:
+    """Async version of get_embedding."""
+    with timed("embed"):
+        return (await get_embeddings_async([text]))[0]
+
+
+def embed_in_batches(
+    texts: Iterable[str],
+    batch_size: int = EMBED_BATCH_SIZE,
+    max_workers: int = EMBED_MAX_WORKERS
+) -> Iterator[Tuple[List[str], List[List[float]]]]:
     """
-    Initialize the vector store with compliance documents.
-    Only runs if the collection is empty.
+    Embed a stream of texts in batches, running several batches concurrently.
+
+    Yields (batch_texts, batch_embeddings) in input order. At most
+    `max_workers` batches are in flight at once, so memory stays bounded
+    no matter how many texts are passed in.
+
+    Args:
+        texts: Texts to embed (any iterable, consumed lazily)
+        batch_size: Number of texts sent per embeddings call
+        max_workers: Maximum number of concurrent embeddings calls
     """
-    # Get or create collection
-    collection = chroma_client.get_or_create_collection(
-        name=COLLECTION_NAME,
-        metadata={"description": "NIST CSF 2.0 and ISO 27001 compliance documents"}
-    )
+    def batches() -> Iterator[List[str]]:
+        batch = []
+        for text in texts:
+            batch.append(text)
+            if len(batch) == batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        in_flight = deque()
+        for batch in batches():
+            in_flight.append((batch, executor.submit(get_embeddings, batch)))
+            if len(in_flight) >= max_workers:
+                done_batch, future = in_flight.popleft()
+                yield done_batch, future.result()
+        while in_flight:
+            done_batch, future = in_flight.popleft()
+            yield done_batch, future.result()
+
+
+def _store_suffix() -> str:
+    return f"_{EMBEDDING_DIMENSIONS}" if EMBEDDING_DIMENSIONS else ""
+
+
+def get_vector_store(backend: str | None = None):
+    """
+    Get the collection for the configured retrieval backend.
+
+    Both backends expose the same Collection-style API
+    (count, get, upsert, delete, query). With shortened embeddings
+    (EMBEDDING_DIMENSIONS), each size gets its own collection/index.
+
+    Args:
+        backend: "chroma" or "numpy" (defaults to VECTOR_BACKEND)
+    """
+    global _numpy_index
+    backend = backend or VECTOR_BACKEND
+    suffix = _store_suffix()
+
+    if backend == "numpy":
+        if _numpy_index is None:
+            _numpy_index = NumpyVectorIndex(
+                VECTOR_INDEX_PATH + suffix,
+                quantization=VECTOR_QUANTIZATION,
+                rescore_multiplier=RESCORE_MULTIPLIER
+            )
+        return _numpy_index
+    if backend == "chroma":
+        return get_chroma_client().get_or_create_collection(
+            name=COLLECTION_NAME + suffix,
+            metadata={"description": "NIST CSF 2.0 and ISO 27001 compliance documents"}
+        )
+    raise ValueError(f"Unknown vector backend: {backend!r} (expected 'chroma' or 'numpy')")
+
+
+def chunk_documents(documents: List[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+    """Lazily split documents into the chunks that get embedded and indexed."""
+    return iter_chunks(documents, max_tokens=CHUNK_MAX_TOKENS, overlap_tokens=CHUNK_OVERLAP_TOKENS)
+
 
-    # Check if already populated
-    if collection.count() > 0:
-        print(f"Vector store already has {collection.count()} documents")
-        return collection
+def get_reranker():
+    """Get the configured re-ranker (None if RERANKER is "none"), loading it on first use."""
+    global _reranker, _reranker_loaded
+    if not _reranker_loaded:
+        _reranker = load_reranker(RERANKER, RERANK_MODEL, idf_source=lambda: get_lexical_index().idf)
+        _reranker_loaded = True
+    return _reranker
 
-    # Load documents
+
+def get_lexical_index() -> BM25Index:
+    """Get the BM25 keyword index, building it from the document chunks on first use."""
+    global _lexical_index
+    if _lexical_index is None:
+        _lexical_index = BM25Index(list(chunk_documents(load_documents())))
+    return _lexical_index
+
+
+def searchable_text(doc: Dict[str, Any]) -> str:
+    """Text that gets embedded for a document or chunk: title and content combined."""
+    return f"{doc['title']}: {doc['content']}"
+
+
+def document_hash(doc: Dict[str, Any]) -> str:
+    """Hash of everything stored for a document or chunk (searchable text and metadata)."""
+    payload = json.dumps(
+        [searchable_text(doc), doc["source"], doc["section"], doc.get("parent_id")]
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+def sync_vector_store(backend: str | None = None) -> Dict[str, Any]:
+    """
+    Incrementally sync the vector store with data/compliance_docs.json.
+
+    Documents are split into chunks, and each stored chunk carries a hash
+    of its searchable text and metadata. Only new or changed chunks are
+    embedded and upserted, and chunks no longer produced from the JSON file
+    are deleted, so an edit costs O(changed chunks).
+
+    Args:
+        backend: Vector store backend to sync (defaults to VECTOR_BACKEND)
+
+    Returns:
+        Report with the chunk ids that were added, updated and removed,
+        and the number of unchanged chunks
+    """
+    global _lexical_index
+
+    # Cached answers are only valid for the corpus they were generated from
     documents = load_documents()
-    print(f"Loading {len(documents)} compliance documents...")
-
-    # Prepare data for ChromaDB
-    ids = []
-    embeddings = []
-    metadatas = []
-    contents = []
-
-    for doc in documents:
-        # Create searchable text combining title and content
-        searchable_text = f"{doc['title']}: {doc['content']}"
-
-        ids.append(doc["id"])
-        embeddings.append(get_embedding(searchable_text))
-        metadatas.append({
-            "source": doc["source"],
-            "section": doc["section"],
-            "title": doc["title"]
-        })
-        contents.append(doc["content"])
-
-    # Add to collection
-    collection.add(
-        ids=ids,
-        embeddings=embeddings,
-        metadatas=metadatas,
-        documents=contents
+    answer_cache.set_corpus_version(corpus_fingerprint(documents))
+
+    chunks = list(chunk_documents(documents))
+
+    # Rebuild the keyword index alongside the vector store
+    _lexical_index = BM25Index(chunks)
+
+    collection = get_vector_store(backend)
+
+    # Compare stored hashes with the current chunks
+    existing = collection.get(include=["metadatas"])
+    stored_hashes = {
+        chunk_id: (metadata or {}).get("content_hash")
+        for chunk_id, metadata in zip(existing["ids"], existing["metadatas"])
+    }
+    current_ids = {chunk["id"] for chunk in chunks}
+
+    changed = [chunk for chunk in chunks if stored_hashes.get(chunk["id"]) != document_hash(chunk)]
+    removed = [chunk_id for chunk_id in stored_hashes if chunk_id not in current_ids]
+    report = {
+        "added": [chunk["id"] for chunk in changed if chunk["id"] not in stored_hashes],
+        "updated": [chunk["id"] for chunk in changed if chunk["id"] in stored_hashes],
+        "removed": removed,
+        "unchanged": len(chunks) - len(changed)
+    }
+
+    if removed:
+        collection.delete(ids=removed)
+
+    if changed:
+        print(f"Embedding {len(changed)} new or changed chunks from {len(documents)} compliance documents...")
+
+    # Embed in batches and upsert each batch as soon as it's ready
+    synced = 0
+    for batch_texts, batch_embeddings in embed_in_batches(searchable_text(chunk) for chunk in changed):
+        batch_chunks = changed[synced:synced + len(batch_texts)]
+        collection.upsert(
+            ids=[chunk["id"] for chunk in batch_chunks],
+            embeddings=batch_embeddings,
+            metadatas=[
+                {
+                    "source": chunk["source"],
+                    "section": chunk["section"],
+                    "title": chunk["title"],
+                    "parent_id": chunk["parent_id"],
+                    "chunk_index": chunk["chunk_index"],
+                    "content_hash": document_hash(chunk)
+                }
+                for chunk in batch_chunks
+            ],
+            documents=[chunk["content"] for chunk in batch_chunks]
+        )
+        synced += len(batch_chunks)
+        print(f"  Upserted {synced}/{len(changed)} chunks")
+
+    # The NumPy index only writes to disk on save
+    if isinstance(collection, NumpyVectorIndex) and (changed or removed):
+        collection.save()
+
+    return report
+
+
+def snapshot_info(documents: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Settings a startup snapshot depends on; a snapshot built with different ones is stale."""
+    return {
+        "corpus": corpus_fingerprint(documents),
+        "embedding_model": EMBEDDING_MODEL,
+        "embedding_dimensions": EMBEDDING_DIMENSIONS,
+        "chunk_max_tokens": CHUNK_MAX_TOKENS,
+        "chunk_overlap_tokens": CHUNK_OVERLAP_TOKENS
+    }
+
+
+def build_startup_snapshot(path: str = STARTUP_SNAPSHOT_PATH) -> Dict[str, Any]:
+    """
+    Sync the configured vector store and write its contents to a snapshot file.
+
+    Returns:
+        The snapshot's build settings (see snapshot_info)
+    """
+    sync_vector_store()
+    stored = get_vector_store().get(include=["embeddings", "metadatas", "documents"])
+    info = snapshot_info(load_documents())
+    write_snapshot(path, stored["ids"], stored["embeddings"], stored["metadatas"], stored["documents"], info)
+    return info
+
+
+def load_startup_snapshot(path: str = STARTUP_SNAPSHOT_PATH) -> bool:
+    """
+    Serve retrieval from a startup snapshot instead of syncing the vector store.
+
+    The snapshot is opened as the NumPy backend's index (memory-mapped),
+    and the keyword index is rebuilt from its records, so no chunking,
+    embedding or ChromaDB access happens at startup.
+
+    Returns:
+        True if the snapshot was loaded, False if it's missing or stale
+    """
+    global VECTOR_BACKEND, _numpy_index, _lexical_index
+
+    if not path or not os.path.exists(path):
+        return False
+
+    snapshot = read_snapshot(path)
+    info = snapshot_info(load_documents())
+    if snapshot["info"] != info:
+        print(f"Startup snapshot {path} is stale (corpus or settings changed), ignoring it")
+        return False
+
+    _numpy_index = NumpyVectorIndex.from_snapshot(
+        snapshot,
+        VECTOR_INDEX_PATH + _store_suffix(),
+        quantization=VECTOR_QUANTIZATION,
+        rescore_multiplier=RESCORE_MULTIPLIER
     )
+    VECTOR_BACKEND = "numpy"
+    _lexical_index = BM25Index([
+        {"id": chunk_id, "section": metadata["section"], "title": metadata["title"], "content": document}
+        for chunk_id, metadata, document in zip(snapshot["ids"], snapshot["metadatas"], snapshot["documents"])
+    ])
+    answer_cache.set_corpus_version(info["corpus"])
+    return True
+
+
+def initialize_vector_store():
+    """
+    Initialize the vector store with compliance documents.
 
-    print(f"Successfully loaded {len(documents)} documents into vector store")
-    return collection
+    Loads the startup snapshot when it's up to date; otherwise syncs
+    incrementally, so only new or changed documents are embedded.
+    """
+    if load_startup_snapshot():
+        print(f"Loaded {_numpy_index.count()} chunks from startup snapshot {STARTUP_SNAPSHOT_PATH}")
+        return _numpy_index
+
+    report = sync_vector_store()
+    print(
+        f"Vector store synced: {len(report['added'])} added, "
+        f"{len(report['updated'])} updated, {len(report['removed'])} removed, "
+        f"{report['unchanged']} unchanged"
+    )
+    return get_vector_store()
 
 
-def retrieve_relevant_docs(query: str, top_k: int = 4) -> List[Dict[str, Any]]:
+def retrieve_relevant_docs(
+    query: str,
+    top_k: int = 4,
+    query_embedding: List[float] | None = None
+) -> List[Dict[str, Any]]:
     """
     Retrieve the most relevant compliance documents for a query.
 
     Args:
         query: The customer question
         top_k: Number of documents to retrieve
+        query_embedding: Precomputed embedding of the query (optional)
 
     Returns:
         List of relevant documents with metadata
     """
-    collection = chroma_client.get_collection(name=COLLECTION_NAME)
-
     # Get query embedding
-    query_embedding = get_embedding(query)
+    if query_embedding is None:
+        query_embedding = get_embedding(query)
+
+    return _search_collection([query], [query_embedding], top_k)[0]
+
+
+async def retrieve_relevant_docs_async(
+    query: str,
+    top_k: int = 4,
+    query_embedding: List[float] | None = None
+) -> List[Dict[str, Any]]:
+    """Async version of retrieve_relevant_docs (the ChromaDB query runs in a worker thread)."""
+    if query_embedding is None:
+        query_embedding = await get_embedding_async(query)
+
+    return (await asyncio.to_thread(_search_collection, [query], [query_embedding], top_k))[0]
+
+
+def _search_collection(
+    queries: List[str],
+    query_embeddings: List[List[float]],
+    top_k: int
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search the vector store for one or more queries and format the hits per query.
+
+    Hits are chunks; they are collapsed back to their parent documents, and
+    the top_k parents are returned. In "hybrid" RETRIEVAL_MODE, vector
+    candidates are first fused with BM25 keyword matches using reciprocal
+    rank fusion. When a RERANKER is configured, RERANK_CANDIDATES parents
+    are fetched and re-ranked, and at most RERANK_TOP_K are returned.
+    """
+    reranker = get_reranker()
+    n_fetch = max(top_k, RERANK_CANDIDATES) if reranker else top_k
+
+    with timed("retrieve"):
+        candidates = _search_collection_untimed(queries, query_embeddings, n_fetch)
+    if reranker is None:
+        return candidates
+
+    with timed("rerank"):
+        return [
+            rerank(
+                query,
+                docs,
+                min(top_k, RERANK_TOP_K),
+                reranker,
+                budget_seconds=RERANK_BUDGET_MS / 1000,
+                batch_size=RERANK_BATCH_SIZE
+            )
+            for query, docs in zip(queries, candidates)
+        ]
 
-    # Search for similar documents
+
+def _search_collection_untimed(
+    queries: List[str],
+    query_embeddings: List[List[float]],
+    top_k: int
+) -> List[List[Dict[str, Any]]]:
+    collection = get_vector_store()
+    hybrid = RETRIEVAL_MODE == "hybrid"
+
+    # Over-fetch chunks so enough distinct parents remain after collapsing
+    n_candidates = top_k * CHUNKS_PER_RESULT
+    if hybrid:
+        n_candidates = max(n_candidates, HYBRID_CANDIDATES)
+
+    # Search for similar chunks
     results = collection.query(
-        query_embeddings=[query_embedding],
-        n_results=top_k,
+        query_embeddings=query_embeddings,
+        n_results=n_candidates,
         include=["documents", "metadatas", "distances"]
     )
 
     # Format results
-    relevant_docs = []
-    for i in range(len(results["ids"][0])):
-        relevant_docs.append({
-            "id": results["ids"][0][i],
-            "content": results["documents"][0][i],
-            "source": results["metadatas"][0][i]["source"],
-            "section": results["metadatas"][0][i]["section"],
-            "title": results["metadatas"][0][i]["title"],
-            "relevance_score": 1 - results["distances"][0][i]  # Convert distance to similarity
-        })
+    all_docs = []
+    for q in range(len(query_embeddings)):
+        relevant_docs = []
+        for i in range(len(results["ids"][q])):
+            relevant_docs.append(_format_hit(
+                results["ids"][q][i],
+                results["documents"][q][i],
+                results["metadatas"][q][i],
+                results["distances"][q][i]
+            ))
+        if hybrid:
+            relevant_docs = _fuse_with_keywords(collection, queries[q], query_embeddings[q], relevant_docs, n_candidates)
+        all_docs.append(collapse_to_parents(relevant_docs, top_k, max_chunks_per_parent=CHUNKS_PER_RESULT))
 
-    return relevant_docs
+    return all_docs
 
 
-def generate_response(question: str, relevant_docs: List[Dict[str, Any]]) -> str:
-    """
-    Generate a vendor response using retrieved compliance documents.
+def _format_hit(doc_id: str, content: str, metadata: Dict[str, Any], distance: float) -> Dict[str, Any]:
+    return {
+        "id": doc_id,
+        "parent_id": metadata.get("parent_id", doc_id),
+        "chunk_index": metadata.get("chunk_index", 0),
+        "content": content,
+        "source": metadata["source"],
+        "section": metadata["section"],
+        "title": metadata["title"],
+        "relevance_score": 1 - distance  # Convert distance to similarity
+    }
 
-    Args:
-        question: The customer question
-        relevant_docs: Retrieved compliance documents
 
-    Returns:
-        Generated vendor response
-    """
-    # Build context from retrieved documents
-    context_parts = []
-    for doc in relevant_docs:
-        context_parts.append(
-            f"[{doc['source']} - {doc['section']}]\n"
-            f"{doc['title']}: {doc['content']}"
-        )
-    context = "\n\n".join(context_parts)
+def _fuse_with_keywords(
+    collection,
+    query: str,
+    query_embedding: List[float],
+    vector_docs: List[Dict[str, Any]],
+    limit: int
+) -> List[Dict[str, Any]]:
+    """Re-rank vector candidates together with BM25 matches using reciprocal rank fusion."""
+    keyword_ids = [doc_id for doc_id, _ in get_lexical_index().search(query, HYBRID_CANDIDATES)]
+    fused_ids = [
+        doc_id for doc_id, _ in reciprocal_rank_fusion([[doc["id"] for doc in vector_docs], keyword_ids], k=RRF_K)
+    ][:limit]
+
+    docs_by_id = {doc["id"]: doc for doc in vector_docs}
+
+    # Keyword-only hits weren't returned by the vector query: fetch them and
+    # score them the same way the vector store does (squared L2 on unit vectors)
+    missing = [doc_id for doc_id in fused_ids if doc_id not in docs_by_id]
+    if missing:
+        fetched = collection.get(ids=missing, include=["documents", "metadatas", "embeddings"])
+        query_vector = np.asarray(query_embedding, dtype=np.float32)
+        query_vector /= np.linalg.norm(query_vector) or 1
+        for doc_id, content, metadata, embedding in zip(
+            fetched["ids"], fetched["documents"], fetched["metadatas"], fetched["embeddings"]
+        ):
+            vector = np.asarray(embedding, dtype=np.float32)
+            vector /= np.linalg.norm(vector) or 1
+            distance = float(np.sum((query_vector - vector) ** 2))
+            docs_by_id[doc_id] = _format_hit(doc_id, content, metadata, distance)
 
-    # System prompt for professional vendor responses
-    system_prompt = """You are a security compliance expert helping vendors respond to customer security questionnaires.
+    return [docs_by_id[doc_id] for doc_id in fused_ids if doc_id in docs_by_id]
+
+
+# System prompt for professional vendor responses
+SYSTEM_PROMPT = """You are a security compliance expert helping vendors respond to customer security questionnaires.
 Your responses should be:
 1. Professional and confident
 2. Specific to the question asked
@@ -164,6 +770,30 @@ Your responses should be:
 Use the provided compliance framework context to inform your response.
 Do NOT make up capabilities - only reference what is standard practice based on the frameworks."""
 
+
+def build_messages(
+    question: str,
+    relevant_docs: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, str]], Dict[str, int]]:
+    """
+    Build the chat messages for a question and its retrieved documents.
+
+    The context is deduplicated, trimmed to the most relevant sentences and
+    capped at CONTEXT_TOKEN_BUDGET tokens.
+
+    Returns:
+        (messages, context_stats) where context_stats reports the tokens saved
+    """
+    # Build context from retrieved documents
+    context, context_stats = assemble_context(
+        question,
+        relevant_docs,
+        max_tokens=CONTEXT_TOKEN_BUDGET,
+        snippet_max_tokens=SNIPPET_TOKEN_BUDGET,
+        duplicate_threshold=DUPLICATE_SNIPPET_THRESHOLD
+    )
+    CONTEXT_TOKENS_SAVED.inc(context_stats["tokens_saved"])
+
     # User prompt with context and question
     user_prompt = f"""Customer Question:
 {question}
@@ -173,37 +803,135 @@ Relevant Compliance Framework Context:
 
 Generate a professional vendor response that addresses the customer's question using the compliance framework context above. Include specific references to the frameworks where appropriate."""
 
-    # Generate response
-    response = client.chat.completions.create(
-        model="gpt-4o-mini",
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": user_prompt}
-        ],
-        temperature=0.7,
-        max_tokens=1000
-    )
-
-    return response.choices[0].message.content
+    messages = [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": user_prompt}
+    ]
+    return messages, context_stats
 
 
-def ask_compliance_question(question: str) -> Dict[str, Any]:
+def generate_response(
+    question: str,
+    relevant_docs: List[Dict[str, Any]],
+    messages: List[Dict[str, str]] | None = None
+) -> str:
     """
-    Main function: Process a compliance question through the RAG pipeline.
+    Generate a vendor response using retrieved compliance documents.
 
     Args:
-        question: Customer's security question
+        question: The customer question
+        relevant_docs: Retrieved compliance documents
+        messages: Prebuilt messages from build_messages (optional)
 
     Returns:
-        Dict with response, sources, and relevant snippets
+        Generated vendor response
     """
-    # Step 1: Retrieve relevant documents
-    relevant_docs = retrieve_relevant_docs(question, top_k=4)
+    if messages is None:
+        messages, _ = build_messages(question, relevant_docs)
+
+    with timed("generate"):
+        response = call_with_retry(
+            lambda: get_client().chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=CHAT_MAX_TOKENS
+            ),
+            chat_rate_limiter,
+            tokens=_estimate_chat_tokens(messages),
+            max_retries=OPENAI_MAX_RETRIES,
+            base_seconds=OPENAI_BACKOFF_SECONDS
+        )
+
+    _record_chat_usage(response.usage)
+    return response.choices[0].message.content
+
+
+async def generate_response_async(
+    question: str,
+    relevant_docs: List[Dict[str, Any]],
+    messages: List[Dict[str, str]] | None = None
+) -> str:
+    """Async version of generate_response."""
+    if messages is None:
+        messages, _ = build_messages(question, relevant_docs)
+
+    with timed("generate"):
+        response = await call_with_retry_async(
+            lambda: get_async_client().chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=CHAT_MAX_TOKENS
+            ),
+            chat_rate_limiter,
+            tokens=_estimate_chat_tokens(messages),
+            max_retries=OPENAI_MAX_RETRIES,
+            base_seconds=OPENAI_BACKOFF_SECONDS
+        )
+
+    _record_chat_usage(response.usage)
+    return response.choices[0].message.content
+
 
-    # Step 2: Generate response
-    response = generate_response(question, relevant_docs)
+async def generate_response_stream(
+    question: str,
+    relevant_docs: List[Dict[str, Any]],
+    messages: List[Dict[str, str]] | None = None
+) -> AsyncIterator[str]:
+    """Streaming version of generate_response: yields text chunks as the model produces them."""
+    if messages is None:
+        messages, _ = build_messages(question, relevant_docs)
 
-    # Step 3: Extract unique sources
+    start = time.perf_counter()
+    with timed("generate"):
+        # Only opening the stream is retried; once tokens flow, errors propagate
+        stream = await call_with_retry_async(
+            lambda: get_async_client().chat.completions.create(
+                model=CHAT_MODEL,
+                messages=messages,
+                temperature=0.7,
+                max_tokens=CHAT_MAX_TOKENS,
+                stream=True,
+                stream_options={"include_usage": True}
+            ),
+            chat_rate_limiter,
+            tokens=_estimate_chat_tokens(messages),
+            max_retries=OPENAI_MAX_RETRIES,
+            base_seconds=OPENAI_BACKOFF_SECONDS
+        )
+
+        first_token = True
+        async for chunk in stream:
+            # The final chunk carries usage and no choices
+            if chunk.usage:
+                _record_chat_usage(chunk.usage)
+            if chunk.choices and chunk.choices[0].delta.content:
+                if first_token:
+                    record_stage("first_token", time.perf_counter() - start)
+                    first_token = False
+                yield chunk.choices[0].delta.content
+
+
+def _estimate_chat_tokens(messages: List[Dict[str, str]]) -> int:
+    """Tokens a chat call counts against the TPM limit: the prompt plus the max completion."""
+    return sum(count_tokens(message["content"]) for message in messages) + CHAT_MAX_TOKENS
+
+
+def _record_chat_usage(usage):
+    if usage is not None:
+        record_usage("prompt", usage.prompt_tokens)
+        record_usage("completion", usage.completion_tokens)
+
+
+def format_answer(
+    question: str,
+    response: str,
+    relevant_docs: List[Dict[str, Any]],
+    context_stats: Dict[str, int] | None = None
+) -> Dict[str, Any]:
+    """Package a generated response with its sources, snippets and context token savings."""
+    # Extract unique sources
     sources = list(set(doc["source"] for doc in relevant_docs))
 
     return {
@@ -219,10 +947,202 @@ def ask_compliance_question(question: str) -> Dict[str, Any]:
                 "relevance": round(doc["relevance_score"], 3)
             }
             for doc in relevant_docs
-        ]
+        ],
+        "cached": False,
+        "context_tokens_saved": (context_stats or {}).get("tokens_saved", 0)
     }
 
 
+def normalize_question(question: str) -> str:
+    """Key for coalescing identical questions: case, whitespace and trailing punctuation ignored."""
+    return " ".join(question.casefold().split()).rstrip("?!. ")
+
+
+def ask_compliance_question(question: str) -> Dict[str, Any]:
+    """
+    Main function: Process a compliance question through the RAG pipeline.
+
+    Concurrent calls with the same normalized question share one pipeline run.
+
+    Args:
+        question: Customer's security question
+
+    Returns:
+        Dict with response, sources, and relevant snippets
+    """
+    result, shared = _in_flight.do(normalize_question(question), lambda: _answer_question(question))
+    if shared:
+        COALESCED_REQUESTS.inc()
+    return {**result, "question": question}
+
+
+def _answer_question(question: str) -> Dict[str, Any]:
+    # Step 1: Serve from the answer cache if a similar question was already answered
+    question_embedding = get_embedding(question)
+    cached = answer_cache.get(question_embedding)
+    if cached is not None:
+        return {**cached, "question": question, "cached": True}
+
+    # Step 2: Retrieve relevant documents
+    relevant_docs = retrieve_relevant_docs(question, top_k=4, query_embedding=question_embedding)
+
+    # Step 3: Generate response from a token-budgeted context
+    messages, context_stats = build_messages(question, relevant_docs)
+    response = generate_response(question, relevant_docs, messages)
+
+    # Step 4: Remember the answer for similar questions
+    result = format_answer(question, response, relevant_docs, context_stats)
+    answer_cache.put(question_embedding, result)
+    return result
+
+
+async def ask_compliance_question_async(question: str) -> Dict[str, Any]:
+    """
+    Async version of ask_compliance_question, used by the FastAPI endpoint.
+
+    Args:
+        question: Customer's security question
+
+    Returns:
+        Dict with response, sources, and relevant snippets
+    """
+    result, shared = await _in_flight_async.do(normalize_question(question), lambda: _answer_question_async(question))
+    if shared:
+        COALESCED_REQUESTS.inc()
+    return {**result, "question": question}
+
+
+async def _answer_question_async(question: str) -> Dict[str, Any]:
+    question_embedding = await get_embedding_async(question)
+    cached = answer_cache.get(question_embedding)
+    if cached is not None:
+        return {**cached, "question": question, "cached": True}
+
+    relevant_docs = await retrieve_relevant_docs_async(question, top_k=4, query_embedding=question_embedding)
+    messages, context_stats = build_messages(question, relevant_docs)
+    response = await generate_response_async(question, relevant_docs, messages)
+
+    result = format_answer(question, response, relevant_docs, context_stats)
+    answer_cache.put(question_embedding, result)
+    return result
+
+
+async def stream_compliance_answer(question: str) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Streaming version of ask_compliance_question_async.
+
+    Yields events as soon as each piece is available:
+    - {"type": "snippets", "sources": [...], "relevant_snippets": [...], "cached": bool}
+      right after retrieval
+    - {"type": "token", "content": "..."} for every generated chunk
+    - {"type": "done", "response": "...", "context_tokens_saved": n} at the end
+    """
+    question_embedding = await get_embedding_async(question)
+    cached = answer_cache.get(question_embedding)
+    if cached is not None:
+        yield {
+            "type": "snippets",
+            "sources": cached["sources"],
+            "relevant_snippets": cached["relevant_snippets"],
+            "cached": True
+        }
+        yield {"type": "token", "content": cached["response"]}
+        yield {"type": "done", "response": cached["response"], "context_tokens_saved": cached["context_tokens_saved"]}
+        return
+
+    relevant_docs = await retrieve_relevant_docs_async(question, top_k=4, query_embedding=question_embedding)
+    messages, context_stats = build_messages(question, relevant_docs)
+    result = format_answer(question, "", relevant_docs, context_stats)
+    yield {
+        "type": "snippets",
+        "sources": result["sources"],
+        "relevant_snippets": result["relevant_snippets"],
+        "cached": False
+    }
+
+    parts = []
+    async for token in generate_response_stream(question, relevant_docs, messages):
+        parts.append(token)
+        yield {"type": "token", "content": token}
+
+    result["response"] = "".join(parts)
+    answer_cache.put(question_embedding, result)
+    yield {"type": "done", "response": result["response"], "context_tokens_saved": result["context_tokens_saved"]}
+
+
+async def answer_questionnaire_async(
+    questions: List[str],
+    top_k: int = 4,
+    concurrency: int = QUESTIONNAIRE_CONCURRENCY
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Answer a whole questionnaire, yielding each answer as soon as it's ready.
+
+    1. Embeds all questions with batched embeddings calls
+    2. Serves answer-cache hits immediately
+    3. Retrieves documents for the rest with one multi-query vector store lookup
+    4. Fans generation out with at most `concurrency` calls in flight
+
+    Args:
+        questions: Customer security questions
+        top_k: Number of documents to retrieve per question
+        concurrency: Maximum number of concurrent generations
+
+    Yields:
+        Answer dicts (as returned by ask_compliance_question_async) with the
+        question's position in `questions` under "index". A question that
+        fails yields {"index", "question", "error"} instead.
+    """
+    batches = [questions[start:start + EMBED_BATCH_SIZE] for start in range(0, len(questions), EMBED_BATCH_SIZE)]
+    with timed("embed"):
+        embeddings = [
+            embedding
+            for batch_embeddings in await asyncio.gather(*(get_embeddings_async(batch) for batch in batches))
+            for embedding in batch_embeddings
+        ]
+
+    pending = []
+    for index, (question, embedding) in enumerate(zip(questions, embeddings)):
+        cached = answer_cache.get(embedding)
+        if cached is not None:
+            yield {**cached, "question": question, "cached": True, "index": index}
+        else:
+            pending.append(index)
+
+    if not pending:
+        return
+
+    all_docs = await asyncio.to_thread(
+        _search_collection,
+        [questions[i] for i in pending],
+        [embeddings[i] for i in pending],
+        top_k
+    )
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def answer(index: int, relevant_docs: List[Dict[str, Any]]) -> Dict[str, Any]:
+        question = questions[index]
+        messages, context_stats = build_messages(question, relevant_docs)
+        try:
+            async with semaphore:
+                response = await generate_response_async(question, relevant_docs, messages)
+        except Exception as e:
+            return {"index": index, "question": question, "error": str(e)}
+
+        result = format_answer(question, response, relevant_docs, context_stats)
+        answer_cache.put(embeddings[index], result)
+        return {**result, "index": index}
+
+    tasks = [asyncio.create_task(answer(index, docs)) for index, docs in zip(pending, all_docs)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Stop outstanding generations if the consumer goes away early
+        for task in tasks:
+            task.cancel()
+
+
 # Initialize on module load (for development)
 if __name__ == "__main__":
     print("Initializing vector store...")
@@ -0,0 +1,159 @@
+"""
+Candidate Re-ranking
+
+Second-stage scoring between retrieval and generation:
+1. Retrieval over-fetches candidates; a re-ranker scores every
+   (question, candidate) pair and only the best few go into the prompt
+2. LexicalReranker: dependency-free CPU scorer, vectorized with NumPy
+   over each batch of candidates
+3. CrossEncoderReranker: a sentence-transformers cross-encoder, used
+   when the package is installed
+4. A latency budget: candidates are scored in batches, and if the budget
+   runs out before all batches are done the vector ordering is kept
+"""
+
+import time
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from lexical_index import tokenize
+from metrics import Counter
+
+RERANK_FALLBACKS = Counter(
+    "rag_rerank_fallbacks_total",
+    "Re-rankings abandoned for the vector ordering because the latency budget ran out"
+)
+
+
+class LexicalReranker:
+    """
+    Cheap stand-in for a cross-encoder.
+
+    Scores how well each candidate covers the question: IDF-weighted
+    coverage of the question terms in the content and in the title/section,
+    coverage of the question's word pairs (phrases), plus the retrieval
+    relevance score so the vector signal isn't thrown away.
+
+    IDF comes from `idf_source` (a callable returning term -> IDF for the
+    whole corpus), so scores are comparable across batches. Without it,
+    all question terms weigh the same.
+    """
+    name = "lexical"
+
+    def __init__(
+        self,
+        content_weight: float = 1.0,
+        field_weight: float = 0.5,
+        phrase_weight: float = 0.5,
+        relevance_weight: float = 1.0,
+        idf_source: Callable[[], Dict[str, float]] | None = None
+    ):
+        self.idf_source = idf_source
+        self.weights = np.array([content_weight, field_weight, phrase_weight, relevance_weight], dtype=np.float32)
+
+    def score(self, question: str, candidates: List[Dict[str, Any]]) -> List[float]:
+        relevance = np.array([doc.get("relevance_score", 0.0) for doc in candidates], dtype=np.float32)
+        question_terms = tokenize(question)
+        terms = list(dict.fromkeys(question_terms))
+        if not terms:
+            return relevance.tolist()
+        phrases = list(dict.fromkeys(zip(question_terms, question_terms[1:])))
+
+        content_tokens = [tokenize(doc["content"]) for doc in candidates]
+        content_sets = [set(tokens) for tokens in content_tokens]
+        field_sets = [set(tokenize(f"{doc['section']} {doc['title']}")) for doc in candidates]
+        phrase_sets = [set(zip(tokens, tokens[1:])) for tokens in content_tokens]
+
+        # Presence matrices: candidates x question terms
+        in_content = np.array([[term in tokens for term in terms] for tokens in content_sets], dtype=np.float32)
+        in_fields = np.array([[term in tokens for term in terms] for tokens in field_sets], dtype=np.float32)
+
+        if self.idf_source is not None:
+            corpus_idf = self.idf_source()
+            idf = np.array([corpus_idf.get(term, 0.0) for term in terms], dtype=np.float32)
+        else:
+            idf = np.ones(len(terms), dtype=np.float32)
+        idf /= idf.sum() or 1
+
+        features = np.zeros((len(candidates), 4), dtype=np.float32)
+        features[:, 0] = in_content @ idf
+        features[:, 1] = in_fields @ idf
+        if phrases:
+            features[:, 2] = [
+                sum(phrase in tokens for phrase in phrases) / len(phrases) for tokens in phrase_sets
+            ]
+        features[:, 3] = relevance
+        return (features @ self.weights).tolist()
+
+
+class CrossEncoderReranker:
+    """sentence-transformers CrossEncoder run on CPU (requires sentence-transformers)."""
+    name = "cross-encoder"
+
+    def __init__(self, model_name: str):
+        from sentence_transformers import CrossEncoder
+        self.model = CrossEncoder(model_name, device="cpu")
+
+    def score(self, question: str, candidates: List[Dict[str, Any]]) -> List[float]:
+        pairs = [(question, f"{doc['title']}: {doc['content']}") for doc in candidates]
+        return [float(score) for score in self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)]
+
+
+def load_reranker(name: str, model_name: str, idf_source: Callable[[], Dict[str, float]] | None = None):
+    """
+    Create the configured re-ranker.
+
+    Args:
+        name: "lexical", "cross-encoder" or "none"
+        model_name: Cross-encoder model (only used for "cross-encoder")
+        idf_source: Corpus IDF for the lexical re-ranker (see LexicalReranker)
+
+    Returns:
+        A re-ranker, or None when re-ranking is disabled. Falls back to the
+        lexical re-ranker if sentence-transformers isn't installed.
+    """
+    if name == "none":
+        return None
+    if name == "lexical":
+        return LexicalReranker(idf_source=idf_source)
+    if name == "cross-encoder":
+        try:
+            return CrossEncoderReranker(model_name)
+        except ImportError:
+            print("sentence-transformers is not installed, using the lexical re-ranker")
+            return LexicalReranker(idf_source=idf_source)
+    raise ValueError(f"Unknown reranker: {name!r} (expected 'lexical', 'cross-encoder' or 'none')")
+
+
+def rerank(
+    question: str,
+    candidates: List[Dict[str, Any]],
+    top_k: int,
+    reranker,
+    budget_seconds: float,
+    batch_size: int = 8
+) -> List[Dict[str, Any]]:
+    """
+    Re-order retrieval candidates by re-ranker score and keep the best top_k.
+
+    Candidates are scored batch by batch. If the budget is used up before
+    the next batch starts, the original (vector) ordering is returned
+    instead, so a slow re-ranker can't stall the request.
+
+    Returns:
+        Up to top_k candidates, each with an added `rerank_score`
+    """
+    if len(candidates) <= 1:
+        return candidates[:top_k]
+
+    deadline = time.perf_counter() + budget_seconds
+    scores: List[float] = []
+    for start in range(0, len(candidates), batch_size):
+        if time.perf_counter() > deadline:
+            RERANK_FALLBACKS.inc()
+            return candidates[:top_k]
+        scores.extend(reranker.score(question, candidates[start:start + batch_size]))
+
+    order = sorted(range(len(candidates)), key=lambda i: scores[i], reverse=True)
+    return [{**candidates[i], "rerank_score": scores[i]} for i in order[:top_k]]
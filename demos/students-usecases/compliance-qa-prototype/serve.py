@@ -0,0 +1,51 @@
+"""
+Multi-Worker Server
+
+Serves the API from several processes that share one read-only index:
+1. Syncs the vector store and writes the startup snapshot once, in this
+   (parent) process
+2. Starts uvicorn with N worker processes pointed at the snapshot
+3. Each worker memory-maps the snapshot read-only, so the embedding
+   matrix lives once in the OS page cache instead of once per worker,
+   and no worker opens ChromaDB or embeds anything at startup
+
+Usage:
+    python serve.py --workers 4 --port 8000
+"""
+
+import argparse
+import os
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the compliance Q&A API with multiple workers")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1, help="Worker processes (default: all cores)")
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--snapshot", help="Snapshot file (default: STARTUP_SNAPSHOT_PATH)")
+    parser.add_argument("--skip-build", action="store_true", help="Reuse the existing snapshot as is")
+    args = parser.parse_args()
+
+    # Workers import main.py and serve static files relative to this directory
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+
+    import uvicorn
+    from rag import STARTUP_SNAPSHOT_PATH, build_startup_snapshot
+
+    snapshot_path = os.path.abspath(args.snapshot or STARTUP_SNAPSHOT_PATH)
+    if args.skip_build:
+        if not os.path.exists(snapshot_path):
+            parser.error(f"--skip-build given but {snapshot_path} does not exist")
+    else:
+        print(f"Building startup snapshot {snapshot_path}...")
+        build_startup_snapshot(snapshot_path)
+
+    # Inherited by the worker processes
+    os.environ["STARTUP_SNAPSHOT_PATH"] = snapshot_path
+
+    print(f"Starting {args.workers} workers on {args.host}:{args.port}")
+    uvicorn.run("main:app", host=args.host, port=args.port, workers=args.workers)
+
+
+if __name__ == "__main__":
+    main()
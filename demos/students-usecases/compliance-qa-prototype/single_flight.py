@@ -0,0 +1,86 @@
+"""
+Single-Flight Request Coalescing
+
+Concurrent calls with the same key share one in-flight computation:
+1. The first caller for a key (the leader) runs the work
+2. Callers arriving while it runs wait for the leader's result (or error)
+   instead of repeating the work
+3. The key is released as soon as the work finishes, so later calls run
+   fresh (longer-lived reuse is the answer cache's job)
+
+SingleFlight is for threads, AsyncSingleFlight for coroutines on one event loop.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """Coalesce concurrent calls across threads."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run fn() unless a call for key is already in flight, then share its result.
+
+        Returns:
+            (result, shared) where shared is True if another caller computed it
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+
+        if not leader:
+            return future.result(), True
+
+        try:
+            result = fn()
+            future.set_result(result)
+            return result, False
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+
+
+class AsyncSingleFlight:
+    """Coalesce concurrent calls on an event loop."""
+
+    def __init__(self):
+        self._calls: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, factory: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Await factory() unless a call for key is already in flight, then share its result.
+
+        The shared task is shielded, so a caller that gets cancelled (e.g. a
+        client disconnecting) doesn't cancel the work for everyone else.
+
+        Returns:
+            (result, shared) where shared is True if another caller computed it
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            self._calls[key] = task
+            task.add_done_callback(lambda done: self._release(key, done))
+
+        return await asyncio.shield(task), shared
+
+    def _release(self, key: str, task: asyncio.Task):
+        if self._calls.get(key) is task:
+            del self._calls[key]
+        # Don't warn about unretrieved exceptions if every waiter was cancelled
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,115 @@
+"""
+Startup Snapshot
+
+Single-file binary snapshot of the vector index, so a new replica can
+start serving without opening ChromaDB, chunking or embedding anything:
+1. Preamble: magic bytes and the length of the JSON header
+2. JSON header: row count, dimensions, records blob length, and the
+   settings the snapshot was built with (corpus fingerprint, models, chunking)
+3. float32 embedding matrix with normalized rows, 64-byte aligned so it
+   is memory-mapped straight from the file
+4. JSON blob with the ids, metadatas and documents
+
+Build one with:
+    python snapshot.py [path]
+"""
+
+import json
+import os
+import struct
+import sys
+from typing import Any, Dict, List
+
+import numpy as np
+
+MAGIC = b"RAGSNAP1"
+PREAMBLE = struct.Struct("<8sQ")  # magic, header length
+ALIGNMENT = 64
+
+
+def _matrix_offset(header_length: int) -> int:
+    end = PREAMBLE.size + header_length
+    return (end + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def write_snapshot(
+    path: str,
+    ids: List[str],
+    embeddings: Any,
+    metadatas: List[Dict[str, Any]],
+    documents: List[str],
+    info: Dict[str, Any]
+):
+    """
+    Write a snapshot file atomically.
+
+    Args:
+        path: Destination file
+        ids, embeddings, metadatas, documents: Index contents, row-aligned
+        info: Build settings stored in the header and compared on load
+    """
+    matrix = np.asarray(embeddings, dtype=np.float32)
+    if matrix.size == 0:
+        matrix = matrix.reshape(0, 0)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix = np.ascontiguousarray(matrix / norms, dtype=np.float32)
+
+    records = json.dumps({"ids": ids, "metadatas": metadatas, "documents": documents}).encode("utf-8")
+    header = json.dumps({
+        "count": matrix.shape[0],
+        "dim": matrix.shape[1],
+        "records_length": len(records),
+        "info": info
+    }).encode("utf-8")
+    matrix_offset = _matrix_offset(len(header))
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(PREAMBLE.pack(MAGIC, len(header)))
+        f.write(header)
+        f.write(b"\0" * (matrix_offset - PREAMBLE.size - len(header)))
+        f.write(matrix.tobytes())
+        f.write(records)
+    os.replace(tmp_path, path)
+
+
+def read_snapshot(path: str) -> Dict[str, Any]:
+    """
+    Open a snapshot file.
+
+    Returns:
+        Dict with info, ids, metadatas, documents and matrix (a read-only
+        memory map, so pages are shared by every process that opens the file)
+    """
+    with open(path, "rb") as f:
+        magic, header_length = PREAMBLE.unpack(f.read(PREAMBLE.size))
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not a startup snapshot")
+        header = json.loads(f.read(header_length))
+
+        matrix_offset = _matrix_offset(header_length)
+        count, dim = header["count"], header["dim"]
+        f.seek(matrix_offset + count * dim * 4)
+        records = json.loads(f.read(header["records_length"]))
+
+    if count:
+        matrix = np.memmap(path, dtype=np.float32, mode="r", offset=matrix_offset, shape=(count, dim))
+    else:
+        matrix = np.empty((0, dim), dtype=np.float32)
+
+    return {
+        "info": header["info"],
+        "ids": records["ids"],
+        "metadatas": records["metadatas"],
+        "documents": records["documents"],
+        "matrix": matrix
+    }
+
+
+if __name__ == "__main__":
+    from rag import STARTUP_SNAPSHOT_PATH, build_startup_snapshot
+
+    target = sys.argv[1] if len(sys.argv) > 1 else STARTUP_SNAPSHOT_PATH
+    build_startup_snapshot(target)
+    print(f"Snapshot written to {target}")
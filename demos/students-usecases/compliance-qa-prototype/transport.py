@@ -0,0 +1,190 @@
+"""
+OpenAI Transport
+
+Shared HTTP plumbing for OpenAI calls:
+1. Pooled keep-alive httpx clients (bounded connections, reused across calls)
+2. Token-bucket rate limiting by requests and tokens per minute, shared by
+   every thread and coroutine in the process
+3. Coordinated backoff: a 429 pauses all callers of that limiter until the
+   server's Retry-After has passed, not just the caller that hit it
+4. Retry with exponential backoff and full jitter for transient errors
+
+The OpenAI SDK's own retries are disabled (max_retries=0) so that all
+retrying goes through call_with_retry / call_with_retry_async.
+"""
+
+import asyncio
+import random
+import threading
+import time
+from typing import Any, Awaitable, Callable
+
+import httpx
+from openai import APIConnectionError, APITimeoutError, InternalServerError, RateLimitError
+
+# Errors worth retrying: rate limits, timeouts and transient server/network failures
+RETRYABLE_ERRORS = (RateLimitError, APITimeoutError, APIConnectionError, InternalServerError)
+
+
+def _limits(max_connections: int, max_keepalive: int, keepalive_expiry: float) -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=max_connections,
+        max_keepalive_connections=max_keepalive,
+        keepalive_expiry=keepalive_expiry
+    )
+
+
+def pooled_http_client(
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    keepalive_expiry: float = 30.0,
+    timeout: float = 60.0
+) -> httpx.Client:
+    """Sync httpx client with a bounded keep-alive connection pool."""
+    return httpx.Client(limits=_limits(max_connections, max_keepalive, keepalive_expiry), timeout=timeout)
+
+
+def pooled_async_http_client(
+    max_connections: int = 100,
+    max_keepalive: int = 20,
+    keepalive_expiry: float = 30.0,
+    timeout: float = 60.0
+) -> httpx.AsyncClient:
+    """Async httpx client with a bounded keep-alive connection pool."""
+    return httpx.AsyncClient(limits=_limits(max_connections, max_keepalive, keepalive_expiry), timeout=timeout)
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `per_minute` tokens per minute.
+
+    Callers reserve tokens up front, and the bucket may go negative; the
+    returned wait is how long the caller must sleep for the deficit to
+    refill. Reservations are first-come, first-served. A rate of 0
+    disables the bucket.
+    """
+
+    def __init__(self, per_minute: float, burst_seconds: float = 10.0):
+        self.rate = per_minute / 60
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """Take `amount` tokens and return the seconds to wait before using them."""
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute limits for one model, plus shared 429 backoff."""
+
+    def __init__(self, requests_per_minute: float, tokens_per_minute: float):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _wait_for(self, tokens: int) -> float:
+        wait = max(self.requests.reserve(1), self.tokens.reserve(tokens))
+        with self._lock:
+            return max(wait, self._paused_until - time.monotonic())
+
+    def acquire(self, tokens: int):
+        """Block until a request using `tokens` tokens fits the limits."""
+        wait = self._wait_for(tokens)
+        if wait > 0:
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int):
+        """Async version of acquire."""
+        wait = self._wait_for(tokens)
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+    def pause(self, seconds: float):
+        """Hold back every caller for `seconds` (after a 429)."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+
+def retry_after_seconds(error: Exception) -> float | None:
+    """Server-requested delay from a 429/5xx response (retry-after-ms or Retry-After), if any."""
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    for header, scale in (("retry-after-ms", 0.001), ("retry-after", 1.0)):
+        value = response.headers.get(header)
+        if value is not None:
+            try:
+                return float(value) * scale
+            except ValueError:
+                pass
+    return None
+
+
+def backoff_delay(attempt: int, base_seconds: float, max_seconds: float = 30.0) -> float:
+    """Exponential backoff with full jitter, so retrying callers spread out."""
+    return random.uniform(0, min(max_seconds, base_seconds * (2 ** attempt)))
+
+
+def _retry_delay(error: Exception, attempt: int, base_seconds: float, limiter: RateLimiter) -> float:
+    delay = backoff_delay(attempt, base_seconds)
+    retry_after = retry_after_seconds(error)
+    if retry_after is not None:
+        delay = retry_after + random.uniform(0, base_seconds)
+    if isinstance(error, RateLimitError):
+        limiter.pause(delay)
+    return delay
+
+
+def call_with_retry(
+    fn: Callable[[], Any],
+    limiter: RateLimiter,
+    tokens: int,
+    max_retries: int = 5,
+    base_seconds: float = 1.0
+) -> Any:
+    """
+    Call fn() within the rate limits, retrying transient errors.
+
+    Args:
+        fn: The OpenAI call
+        limiter: Limits for the model being called
+        tokens: Estimated tokens the call uses (prompt plus max completion)
+        max_retries: Retries before the last error is raised
+        base_seconds: Initial backoff delay
+    """
+    for attempt in range(max_retries + 1):
+        limiter.acquire(tokens)
+        try:
+            return fn()
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            time.sleep(_retry_delay(e, attempt, base_seconds, limiter))
+
+
+async def call_with_retry_async(
+    fn: Callable[[], Awaitable[Any]],
+    limiter: RateLimiter,
+    tokens: int,
+    max_retries: int = 5,
+    base_seconds: float = 1.0
+) -> Any:
+    """Async version of call_with_retry."""
+    for attempt in range(max_retries + 1):
+        await limiter.acquire_async(tokens)
+        try:
+            return await fn()
+        except RETRYABLE_ERRORS as e:
+            if attempt == max_retries:
+                raise
+            await asyncio.sleep(_retry_delay(e, attempt, base_seconds, limiter))
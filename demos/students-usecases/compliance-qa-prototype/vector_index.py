@@ -0,0 +1,292 @@
+"""
+Local In-Process Vector Index
+
+A lightweight alternative to ChromaDB for small corpora:
+1. Embeddings live in a float32 NumPy matrix with pre-normalized rows,
+   memory-mapped from disk (embeddings.npy)
+2. Ids, metadata and documents are kept in records.json
+3. Top-k is one vectorized matmul plus argpartition
+4. Optional int8 or binary quantization: search scans compact codes held
+   in memory (4x / 32x smaller than float32), then re-scores the best
+   candidates with the exact float vectors read from the memory map
+
+NumpyVectorIndex implements the subset of the ChromaDB Collection API that
+rag.py uses (count, get, upsert, delete, query), so the two backends are
+interchangeable. It can also be opened from a startup snapshot (snapshot.py).
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+QUANTIZATIONS = ("none", "int8", "binary")
+
+# Rows scored per block when scanning quantized codes, to bound temporary memory
+BLOCK_ROWS = 8192
+
+# Number of set bits in every byte value, for Hamming distances on packed bits
+_POPCOUNT = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+
+class NumpyVectorIndex:
+    """
+    Brute-force cosine index over a memory-mapped float32 matrix.
+
+    Query distances are squared L2 distances between normalized vectors
+    (2 - 2 * cosine), which matches ChromaDB's default "l2" space for
+    unit-length embeddings, so relevance scores agree across backends.
+    With quantization, the returned distances are still exact: only the
+    candidate selection is approximate.
+    Changes are kept in memory until save() is called.
+    """
+
+    def __init__(self, path: str, quantization: str = "none", rescore_multiplier: int = 10):
+        self._configure(path, quantization, rescore_multiplier)
+
+        if self._records_path.exists() and self._matrix_path.exists():
+            with open(self._records_path, "r") as f:
+                records = json.load(f)
+            self._ids = records["ids"]
+            self._metadatas = records["metadatas"]
+            self._documents = records["documents"]
+            self._matrix = np.load(self._matrix_path, mmap_mode="r")
+
+        self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+
+    @classmethod
+    def from_snapshot(
+        cls,
+        snapshot: Dict[str, Any],
+        path: str,
+        quantization: str = "none",
+        rescore_multiplier: int = 10
+    ) -> "NumpyVectorIndex":
+        """
+        Serve an index loaded with snapshot.read_snapshot.
+
+        The matrix stays memory-mapped from the snapshot file; save()
+        writes to `path` as usual.
+        """
+        index = cls.__new__(cls)
+        index._configure(path, quantization, rescore_multiplier)
+        index._ids = snapshot["ids"]
+        index._metadatas = snapshot["metadatas"]
+        index._documents = snapshot["documents"]
+        index._matrix = snapshot["matrix"]
+        index._positions = {doc_id: i for i, doc_id in enumerate(index._ids)}
+        return index
+
+    def _configure(self, path: str, quantization: str, rescore_multiplier: int):
+        if quantization not in QUANTIZATIONS:
+            raise ValueError(f"Unknown quantization: {quantization!r} (expected one of {', '.join(QUANTIZATIONS)})")
+        self.path = Path(path)
+        self._matrix_path = self.path / "embeddings.npy"
+        self._records_path = self.path / "records.json"
+        self.quantization = quantization
+        self.rescore_multiplier = rescore_multiplier
+
+        self._ids: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._documents: List[str] = []
+        self._matrix = np.empty((0, 0), dtype=np.float32)
+        self._codes: Optional[np.ndarray] = None   # quantized rows, built on first query
+        self._scales: Optional[np.ndarray] = None  # per-row int8 scale factors
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def memory_bytes(self) -> int:
+        """Bytes scanned on every query: the float matrix, or the quantized codes."""
+        if self.quantization == "none":
+            return self._matrix.nbytes
+        codes, scales = self._quantized()
+        return codes.nbytes + (scales.nbytes if scales is not None else 0)
+
+    def get(self, ids: Optional[List[str]] = None, include: Optional[List[str]] = None) -> Dict[str, Any]:
+        include = include or ["metadatas", "documents"]
+        if ids is None:
+            positions = list(range(len(self._ids)))
+        else:
+            positions = [self._positions[doc_id] for doc_id in ids if doc_id in self._positions]
+
+        result: Dict[str, Any] = {"ids": [self._ids[i] for i in positions]}
+        if "metadatas" in include:
+            result["metadatas"] = [self._metadatas[i] for i in positions]
+        if "documents" in include:
+            result["documents"] = [self._documents[i] for i in positions]
+        if "embeddings" in include:
+            result["embeddings"] = np.array(self._matrix[positions])
+        return result
+
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        metadatas: List[Dict[str, Any]],
+        documents: List[str]
+    ):
+        vectors = _normalize_rows(np.asarray(embeddings, dtype=np.float32))
+        # Copy out of the read-only memory map before modifying
+        matrix = np.array(self._matrix) if self._ids else np.empty((0, vectors.shape[1]), dtype=np.float32)
+
+        new_rows = []
+        for doc_id, vector, metadata, document in zip(ids, vectors, metadatas, documents):
+            position = self._positions.get(doc_id)
+            if position is None:
+                self._positions[doc_id] = len(self._ids)
+                self._ids.append(doc_id)
+                self._metadatas.append(metadata)
+                self._documents.append(document)
+                new_rows.append(vector)
+            elif position < len(matrix):
+                matrix[position] = vector
+                self._metadatas[position] = metadata
+                self._documents[position] = document
+            else:
+                # Repeated id within this call
+                new_rows[position - len(matrix)] = vector
+                self._metadatas[position] = metadata
+                self._documents[position] = document
+
+        if new_rows:
+            matrix = np.vstack([matrix, np.stack(new_rows)])
+        self._matrix = matrix
+        self._codes = self._scales = None
+
+    def delete(self, ids: List[str]):
+        doomed = {self._positions[doc_id] for doc_id in ids if doc_id in self._positions}
+        if not doomed:
+            return
+
+        keep = [i for i in range(len(self._ids)) if i not in doomed]
+        self._matrix = np.array(self._matrix[keep])
+        self._ids = [self._ids[i] for i in keep]
+        self._metadatas = [self._metadatas[i] for i in keep]
+        self._documents = [self._documents[i] for i in keep]
+        self._positions = {doc_id: i for i, doc_id in enumerate(self._ids)}
+        self._codes = self._scales = None
+
+    def query(
+        self,
+        query_embeddings: List[List[float]],
+        n_results: int = 10,
+        include: Optional[List[str]] = None
+    ) -> Dict[str, List[List[Any]]]:
+        include = include or ["documents", "metadatas", "distances"]
+        results: Dict[str, List[List[Any]]] = {"ids": []}
+        for field in include:
+            results[field] = []
+
+        queries = _normalize_rows(np.asarray(query_embeddings, dtype=np.float32))
+        k = min(n_results, len(self._ids))
+        if k == 0:
+            for field in results:
+                results[field] = [[] for _ in range(len(queries))]
+            return results
+
+        if self.quantization == "none":
+            ranked_per_query = self._exact_top_k(queries, k)
+        else:
+            ranked_per_query = self._quantized_top_k(queries, k)
+
+        for ranked, similarities in ranked_per_query:
+            results["ids"].append([self._ids[i] for i in ranked])
+            if "documents" in include:
+                results["documents"].append([self._documents[i] for i in ranked])
+            if "metadatas" in include:
+                results["metadatas"].append([self._metadatas[i] for i in ranked])
+            if "distances" in include:
+                results["distances"].append([float(2 - 2 * similarity) for similarity in similarities])
+
+        return results
+
+    def _exact_top_k(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        # One matmul scores every query against every row
+        similarities = queries @ self._matrix.T
+        top = np.argpartition(-similarities, k - 1, axis=1)[:, :k]
+
+        ranked_per_query = []
+        for q, candidates in enumerate(top):
+            ranked = candidates[np.argsort(-similarities[q, candidates])]
+            ranked_per_query.append((ranked, similarities[q, ranked]))
+        return ranked_per_query
+
+    def _quantized_top_k(self, queries: np.ndarray, k: int) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Pick candidates by approximate score on the codes, then re-score them exactly."""
+        n_candidates = min(len(self._ids), k * self.rescore_multiplier)
+        approximate = self._approximate_scores(queries)
+        top = np.argpartition(-approximate, n_candidates - 1, axis=1)[:, :n_candidates]
+
+        ranked_per_query = []
+        for q, candidates in enumerate(top):
+            # Sorted positions read the memory map sequentially
+            candidates = np.sort(candidates)
+            similarities = np.asarray(self._matrix[candidates]) @ queries[q]
+            order = np.argsort(-similarities)[:k]
+            ranked_per_query.append((candidates[order], similarities[order]))
+        return ranked_per_query
+
+    def _approximate_scores(self, queries: np.ndarray) -> np.ndarray:
+        """(queries x rows) scores from the quantized codes, higher is better."""
+        codes, scales = self._quantized()
+        scores = np.empty((len(queries), len(codes)), dtype=np.float32)
+
+        if self.quantization == "int8":
+            for start in range(0, len(codes), BLOCK_ROWS):
+                block = codes[start:start + BLOCK_ROWS].astype(np.float32)
+                scores[:, start:start + len(block)] = (queries @ block.T) * scales[start:start + len(block)]
+        else:
+            # Binary: negative Hamming distance between sign bits
+            query_bits = np.packbits(queries > 0, axis=1)
+            for q, bits in enumerate(query_bits):
+                for start in range(0, len(codes), BLOCK_ROWS):
+                    block = codes[start:start + BLOCK_ROWS]
+                    scores[q, start:start + len(block)] = -_POPCOUNT[block ^ bits].sum(axis=1, dtype=np.int32)
+        return scores
+
+    def _quantized(self) -> Tuple[np.ndarray, Optional[np.ndarray]]:
+        """Quantized codes (and int8 scales), computed from the float matrix on first use."""
+        if self._codes is None:
+            codes, scales = [], []
+            for start in range(0, len(self._matrix), BLOCK_ROWS):
+                block = np.asarray(self._matrix[start:start + BLOCK_ROWS], dtype=np.float32)
+                if self.quantization == "int8":
+                    block_scales = np.abs(block).max(axis=1) / 127
+                    block_scales[block_scales == 0] = 1
+                    codes.append(np.round(block / block_scales[:, np.newaxis]).astype(np.int8))
+                    scales.append(block_scales.astype(np.float32))
+                else:
+                    codes.append(np.packbits(block > 0, axis=1))
+
+            dim = self._matrix.shape[1]
+            width = dim if self.quantization == "int8" else (dim + 7) // 8
+            empty = np.empty((0, width), dtype=np.int8 if self.quantization == "int8" else np.uint8)
+            self._codes = np.concatenate(codes) if codes else empty
+            self._scales = np.concatenate(scales) if scales else None
+        return self._codes, self._scales
+
+    def save(self):
+        """Write the index to disk and re-open the matrix as a memory map."""
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # Write to temporary files first so readers never see a partial index
+        tmp_matrix = self.path / "embeddings.tmp.npy"
+        tmp_records = self.path / "records.tmp.json"
+        np.save(tmp_matrix, np.ascontiguousarray(self._matrix, dtype=np.float32))
+        with open(tmp_records, "w") as f:
+            json.dump({"ids": self._ids, "metadatas": self._metadatas, "documents": self._documents}, f)
+        os.replace(tmp_matrix, self._matrix_path)
+        os.replace(tmp_records, self._records_path)
+
+        self._matrix = np.load(self._matrix_path, mmap_mode="r")
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    if matrix.ndim == 1:
+        matrix = matrix[np.newaxis, :]
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    return matrix / norms